@@ -2,14 +2,32 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
+import uuid
 
 #imports calculations from model.py
-from model import forecast_fcff, dcf_valuation
-from model import compute_wacc
 from model import wacc_compute_weight_ovrride
+from model import tornado_frame
+
+#persistent result store (identical scenarios are read from disk)
+from result_store import stored_compute_wacc
+
+#off-thread model jobs with debounce / superseding
+from executor import DEFAULT_DEBOUNCE_SECONDS, SessionJobs, assumption_key, peer_seed_job, simulation_job
 
 #import data fetched assumptions and raw statements
-from data_fetcher import create_assumptions_from_ticker, fetch_statements_raw
+from data_fetcher import create_assumptions_from_ticker, fetch_statement_keys, load_statement
+
+#import process-wide statement cache (sessions only hold keys)
+from statement_cache import STATEMENT_CACHE
+
+#import peer multiples index (seed exit multiple from comparables)
+from peers import DEFAULT_PEER_UNIVERSE
+
+#import server-side chart aggregation
+from chart_data import CHART_POINT_BUDGET, downsample_line
+
+#import streaming export of model outputs
+from exporter import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_download, frame_chunks
 
 # Streamlit page config
 st.set_page_config(page_title="MNA Dashboard", layout="wide")
@@ -25,6 +43,20 @@ def ai_summary_block(tab_name: str):
     )
 
 
+# Download buttons (CSV / Parquet / Excel) for a model output, built lazily on click
+def export_buttons(name: str, chunks_factory, key: str):
+    cols = st.columns(len(EXPORT_FORMATS))
+    for col, fmt in zip(cols, EXPORT_FORMATS):
+        col.download_button(
+            f"Download {fmt.upper()}",
+            data=export_download(chunks_factory, fmt=fmt, sheet_name=name[:31]),
+            file_name=f"{name}.{fmt}",
+            mime=EXPORT_MIME_TYPES[fmt],
+            key=f"{key}_{fmt}",
+            on_click="ignore",
+        )
+
+
 # Initialize session state for assumptions
 if "assump" not in st.session_state:
     st.session_state.assump = {
@@ -42,10 +74,14 @@ if "assump" not in st.session_state:
     }
 assump = st.session_state.assump
 
-# Initiallize session state for raw financials
+# Initiallize session state for raw financials (meta + statement cache keys)
 if "financials_raw" not in st.session_state:
     st.session_state.financials_raw = None
 
+# Owner token for shared statement cache references
+if "session_uid" not in st.session_state:
+    st.session_state.session_uid = uuid.uuid4().hex
+
 # Initialize session state for financial statement period
 if "statement_period" not in st.session_state:
     st.session_state.statement_period = "annual"
@@ -60,6 +96,12 @@ if "fcff_forecast" not in st.session_state:    # Persist session states across r
 if "val" not in st.session_state:
     st.session_state.val = None
 
+if "jobs" not in st.session_state:    # Per-session model jobs (executor.py)
+    st.session_state.jobs = SessionJobs()
+
+if "sens" not in st.session_state:    # dEV/dx per assumption from the last simulation run
+    st.session_state.sens = None
+
 # Ticker Input in Sidebar
 st.sidebar.header("Load Company (Ticker)")
 ticker = st.sidebar.text_input("Enter Ticker", value="AAPL")
@@ -80,7 +122,7 @@ if st.sidebar.button("Load Ticker Data"):
         assump = st.session_state.assump
 
         # Update WACC slider default
-        wacc_base = compute_wacc(
+        wacc_base = stored_compute_wacc(
             market_cap = assump["market_cap"],
             total_debt = assump["total_debt"],
             interest_expense = assump.get("interest_expense", 0.0),
@@ -97,7 +139,12 @@ if st.sidebar.button("Load Ticker Data"):
 
         # Fetch raw financial statements for Core Financials tab
         try:
-            st.session_state.financials_raw = fetch_statements_raw(ticker, period=st.session_state.statement_period)
+            STATEMENT_CACHE.release(st.session_state.session_uid)
+            st.session_state.financials_raw = fetch_statement_keys(
+                ticker,
+                period=st.session_state.statement_period,
+                owner=st.session_state.session_uid,
+            )
         except Exception as e:
             st.session_state.financials_raw = None
             st.sidebar.warning(f"Could not fetch full financial statements: {e}")
@@ -161,40 +208,107 @@ a["ebitda_margin"] = st.sidebar.slider("EBITDA Margin", min_value=0.0, max_value
 
 a["wacc"] = st.sidebar.slider("WACC", min_value=0.0, max_value=0.5, value=float(a["wacc"]), step=0.005)
 
+# Seed exit multiple from comparable companies (median EV/EBITDA of closest peer group)
+with st.sidebar.expander("Peer Multiples", expanded=False):
+    peer_universe = st.text_area("Peer Universe (tickers)", value=", ".join(DEFAULT_PEER_UNIVERSE))
+    # Index build runs off the script thread (one network call per peer on a cold cache)
+    if st.button("Seed from Peers"):
+        meta = st.session_state.get("company_meta") or {}
+        tickers = tuple(peer_universe.replace("\n", ",").split(","))
+        st.session_state.jobs.submit(
+            "peers",
+            peer_seed_job,
+            tickers,
+            sector=meta.get("sector"),
+            industry=meta.get("industry"),
+            key=(tickers, meta.get("sector"), meta.get("industry")),
+            debounce=0.0,
+        )
+
+    peer_status = st.session_state.jobs.status("peers")
+    if peer_status["error"] is not None:
+        st.warning(f"Could not build peer multiples: {peer_status['error']}")
+
+    # Apply a newly finished seed once
+    if peer_status["state"] != "idle" and peer_status["key"] != st.session_state.get("peer_applied_key"):
+        seeded = peer_status["result"]
+        st.session_state.peer_applied_key = peer_status["key"]
+        if np.isfinite(seeded["exit_multiple"]):
+            a["exit_multiple"] = round(float(seeded["exit_multiple"]), 2)
+            st.session_state.peer_seed = seeded
+        else:
+            st.warning("No usable peer EV/EBITDA multiples found.")
+
+    if peer_status["state"] == "running":
+        @st.fragment(run_every=0.5)
+        def _peer_progress():
+            status = st.session_state.jobs.status("peers")
+            if status["state"] != "running":
+                st.rerun()
+            st.info(f"Fetching peer multiples… {status['elapsed']:.1f}s")
+
+        _peer_progress()
+
+    peer_seed = st.session_state.get("peer_seed")
+    if peer_seed:
+        st.caption(
+            f"{peer_seed['level'].title()}: {peer_seed['group']} | n={peer_seed['count']} | "
+            f"P25 {peer_seed['p25']:.1f}x · Median {peer_seed['median']:.1f}x · P75 {peer_seed['p75']:.1f}x"
+        )
+
 a["exit_multiple"] = st.sidebar.number_input("Exit Multiple", value=float(a["exit_multiple"]))
 
-#Run calc
-if st.sidebar.button("Run Simulation"):
-    try:    
-            #Operating CF Forecast
-            a = st.session_state.assump
-
-            fcff_forecast = forecast_fcff(
-                revenue0=a["revenue0"],
-                years=a["years"],
-                revenue_growth=a["revenue_growth"],
-                ebitda_margin=a["ebitda_margin"],
-                da_pct_revenue=a["da_pct_revenue"],
-                capex_pct_revenue=a["capex_pct_revenue"],
-                nwc_pct_revenue=a["nwc_pct_revenue"],
-                tax_rate=a["tax_rate"],
-                )
-            
-            # Computed WACC from ticker data
-            a["wacc"] = wacc
-
-            # DCF Valuation
-            val = dcf_valuation(
-                fcff_forecast=fcff_forecast,
-                wacc=float(a["wacc"]),
-                exit_multiple=float(a["exit_multiple"]),
-                )
-            
-            st.session_state.fcff_forecast = fcff_forecast
-            st.session_state.val = val
-    except Exception as e:
-        st.error(f"Simulation failed: {e}")
-        st.exception(e)
+# Max rows sent to the browser per chart
+chart_point_budget = st.sidebar.number_input(
+    "Chart Point Budget",
+    value=CHART_POINT_BUDGET,
+    min_value=100,
+    max_value=20_000,
+    step=100,
+)
+
+# Auto-run re-submits on every input change (debounced, stale runs are superseded)
+auto_run = st.sidebar.checkbox("Auto-run Simulation", value=False)
+
+#Run calc (off the script thread; last good result stays on screen meanwhile)
+if st.sidebar.button("Run Simulation") or auto_run:
+    a = st.session_state.assump
+
+    # Computed WACC from ticker data
+    a["wacc"] = wacc
+
+    st.session_state.jobs.submit(
+        "simulation",
+        simulation_job,
+        dict(a),
+        key=assumption_key(a),
+        debounce=DEFAULT_DEBOUNCE_SECONDS if auto_run else 0.0,
+    )
+
+sim_status = st.session_state.jobs.status("simulation")
+if sim_status["error"] is not None:
+    st.error(f"Simulation failed: {sim_status['error']}")
+    st.exception(sim_status["error"])
+
+# Apply a newly finished result once
+if sim_status["state"] != "idle" and sim_status["key"] != st.session_state.get("sim_applied_key"):
+    st.session_state.fcff_forecast = sim_status["result"]["fcff_forecast"]
+    st.session_state.val = sim_status["result"]["val"]
+    st.session_state.sens = sim_status["result"]["sens"]
+    st.session_state.sens_base = sim_status["result"]["sens_base"]
+    st.session_state.sim_applied_key = sim_status["key"]
+
+# Progress indicator that polls the job and reruns the app when it lands
+if sim_status["state"] == "running":
+    @st.fragment(run_every=0.5)
+    def _simulation_progress():
+        status = st.session_state.jobs.status("simulation")
+        if status["state"] != "running":
+            st.rerun()
+        st.info(f"Simulation running… {status['elapsed']:.1f}s (showing last result)")
+
+    with st.sidebar:
+        _simulation_progress()
 
 # Always-available aliases for tab rendering
 company_meta = st.session_state.get("company_meta")
@@ -270,9 +384,11 @@ if st.session_state.fcff_forecast is not None and st.session_state.val is not No
                 st.session_state.statement_period = period
 
                 try:
-                    st.session_state.financials_raw = fetch_statements_raw(
+                    STATEMENT_CACHE.release(st.session_state.session_uid)
+                    st.session_state.financials_raw = fetch_statement_keys(
                         st.session_state.company_meta["ticker"],
                         period=period,
+                        owner=st.session_state.session_uid,
                     )
                     st.rerun()
                     fin = st.session_state["financials_raw"]
@@ -282,16 +398,23 @@ if st.session_state.fcff_forecast is not None and st.session_state.val is not No
                     st.warning(f"Could not fetch {period} statements: {e}")
 
             st.caption(f"{meta.get('company_name', '-')} ({meta.get('ticker', '-')}) | {meta.get('currency', '-')} | {period}")
-            stmts = fin.get("statements", {})
+            stmt_keys = fin.get("statement_keys", {})
+
+            # Resolve keys from the shared cache (refetched if evicted)
+            def _stmt(name):
+                key = stmt_keys.get(name)
+                if key is None:
+                    return pd.DataFrame()
+                return load_statement(key, owner=st.session_state.session_uid)
 
             with st.expander("Income Statement", expanded = True):
-                st.dataframe(stmts.get("income_statement", pd.DataFrame()), use_container_width=True)
+                st.dataframe(_stmt("income_statement"), use_container_width=True)
             
             with st.expander("Balance Sheet", expanded = False):
-                st.dataframe(stmts.get("balance_sheet", pd.DataFrame()), use_container_width=True)
+                st.dataframe(_stmt("balance_sheet"), use_container_width=True)
             
             with st.expander("Cash Flow Statement", expanded = False):
-                st.dataframe(stmts.get("cashflow_statement", pd.DataFrame()), use_container_width=True)
+                st.dataframe(_stmt("cashflow_statement"), use_container_width=True)
 
             st.info(
                 "Core Financials tab is ready.\n\n"
@@ -331,6 +454,7 @@ if st.session_state.fcff_forecast is not None and st.session_state.val is not No
             # ---- Move your FCFF Forecast table here ----
             st.markdown("### FCFF Forecast")
             st.dataframe(fcff_forecast.round(2), use_container_width=True)
+            export_buttons("fcff_forecast", lambda: frame_chunks(fcff_forecast), key="export_fcff")
 
             # ---- Move your FCFF chart here ----
             st.markdown("### FCFF Forecast Chart")
@@ -338,6 +462,7 @@ if st.session_state.fcff_forecast is not None and st.session_state.val is not No
             # Prep data for Altair (keep your y-axis scaling logic)
             chart_df = fcff_forecast.reset_index(drop=True).copy()
             chart_df["Year"] = range(1, len(chart_df) + 1)
+            chart_df = downsample_line(chart_df[["Year", "FCFF"]], "Year", "FCFF", max_points=int(chart_point_budget))
 
             fcff_min = chart_df["FCFF"].min()
             fcff_max = chart_df["FCFF"].max()
@@ -379,6 +504,37 @@ if st.session_state.fcff_forecast is not None and st.session_state.val is not No
         if fcff_forecast is None or val is None:
             st.warning("Run the simulation in the sidebar first.")
         else:
+            sens = st.session_state.get("sens")
+            if sens is not None:
+                st.markdown("### Tornado (Enterprise Value Sensitivity)")
+                shock = st.slider("Assumption Shock (+/- % of base)", min_value=0.01, max_value=0.50, value=0.10, step=0.01)
+                tornado = tornado_frame(sens, st.session_state.sens_base, shock=shock)
+
+                tornado_long = tornado.melt(
+                    id_vars=["Assumption", "Swing"],
+                    value_vars=["EV_Down", "EV_Up"],
+                    var_name="Shock",
+                    value_name="ΔEV",
+                )
+                tornado_chart = (
+                    alt.Chart(tornado_long)
+                    .mark_bar()
+                    .encode(
+                        x=alt.X("ΔEV:Q", title="Change in Enterprise Value (USD)"),
+                        y=alt.Y("Assumption:N", sort=tornado["Assumption"].tolist(), title=None),
+                        color=alt.Color("Shock:N", scale=alt.Scale(domain=["EV_Down", "EV_Up"], range=["#d62728", "#2ca02c"])),
+                        tooltip=[
+                            alt.Tooltip("Assumption:N"),
+                            alt.Tooltip("Shock:N"),
+                            alt.Tooltip("ΔEV:Q", format=",.0f"),
+                        ],
+                    )
+                )
+                st.altair_chart(tornado_chart, use_container_width=True)
+
+                with st.expander("Sensitivity Vector (dEV/dx)", expanded=False):
+                    st.dataframe(tornado.round(4), use_container_width=True)
+
             st.info(
                 "Sensitivity tab skeleton is ready.\n\n"
                 "Next step: build WACC x Exit Multiple and Growth x Margin sensitivity tables in model.py,\n"
@@ -0,0 +1,272 @@
+import yfinance as yf
+import pandas as pd
+import numpy as np
+
+from model import forecast_fcff_batch, dcf_valuation_batch
+from data_fetcher import STATEMENT_ATTRS, statement_key, load_statement
+
+# Historical rolling DCF backtest
+# Statements for every ticker are stacked into one columnar history
+# (ticker, date) x field, assumptions are derived for every period with
+# grouped array ops, and the whole panel is valued in one batched model call.
+
+PERIODS_PER_YEAR = {"annual": 1, "quarterly": 4}
+PERIOD_GAP_DAYS = {"annual": (300, 430), "quarterly": (60, 120)}  # Accepted spacing between consecutive reports
+
+# Statement row labels per field, first match wins (same fallbacks as data_fetcher)
+HISTORY_FIELDS = {
+    "income_statement": {
+        "revenue": ("Total Revenue", "Operating Revenue"),
+        "ebitda": ("EBITDA", "Normalized EBITDA"),
+        "ebit": ("Operating Income", "EBIT"),
+        "tax_expense": ("Tax Provision", "Income Tax Expense", "Provision for Income Taxes"),
+        "pretax_income": ("Pretax Income", "Income Before Tax"),
+    },
+    "cashflow_statement": {
+        "da": ("Depreciation And Amortization", "Depreciation & Amortization", "Depreciation Amortization", "Depreciation"),
+        "capex": ("Capital Expenditure", "Capital Expenditures"),
+    },
+    "balance_sheet": {
+        "current_assets": ("Current Assets", "Total Current Assets"),
+        "current_liabilities": ("Current Liabilities", "Total Current Liabilities"),
+        "shares": ("Ordinary Shares Number", "Share Issued"),
+    },
+}
+
+# Flow fields are summed to trailing twelve months, stock fields are point-in-time
+FLOW_FIELDS = ("revenue", "ebitda", "ebit", "tax_expense", "pretax_income", "da", "capex")
+
+
+def _pick_rows(df: pd.DataFrame, fields: dict) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.columns if not df.empty else pd.DatetimeIndex([]))
+    for field, labels in fields.items():
+        label = next((l for l in labels if l in df.index), None)
+        out[field] = pd.to_numeric(df.loc[label], errors="coerce") if label is not None else np.nan
+    return out
+
+
+# One row per (ticker, date), one column per field
+def build_history(tickers, period: str = "quarterly") -> pd.DataFrame:
+    period = "quarterly" if period == "quarterly" else "annual"
+    frames = []
+    for ticker in tickers:
+        t = yf.Ticker(ticker)
+        parts = [
+            _pick_rows(load_statement(statement_key(ticker, period, name), company=t), fields)
+            for name, fields in HISTORY_FIELDS.items()
+            if name in STATEMENT_ATTRS[period]
+        ]
+        hist = pd.concat(parts, axis=1)
+        if hist.empty:
+            continue
+        hist.index = pd.to_datetime(hist.index)
+        hist["ticker"] = ticker.upper()
+        frames.append(hist.rename_axis("date").reset_index())
+
+    if not frames:
+        return pd.DataFrame(columns=["ticker", "date", *[f for fs in HISTORY_FIELDS.values() for f in fs]])
+
+    history = pd.concat(frames, ignore_index=True)
+    return history.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+
+# Wide (date x ticker) frame -> long (ticker, date, value) sorted for as-of joins
+def _long_by_ticker(wide: pd.DataFrame, name: str, date_dtype) -> pd.DataFrame:
+    long = (
+        wide.rename_axis(index="date", columns="ticker")
+        .stack()
+        .rename(name)
+        .reset_index()
+    )
+    long["ticker"] = long["ticker"].str.upper()
+    long["date"] = pd.to_datetime(long["date"]).dt.tz_localize(None).astype(date_dtype)
+    return long.sort_values("date", kind="stable")
+
+
+def fetch_splits(tickers) -> pd.DataFrame:
+    series = {}
+    for ticker in tickers:
+        try:
+            s = yf.Ticker(ticker).splits
+        except Exception as e:
+            print({"Warning": f"Could not fetch splits for {ticker}: {e}"})
+            continue
+        if isinstance(s, pd.Series) and not s.empty:
+            series[ticker] = s
+    return pd.DataFrame(series)
+
+
+# Close price as of each statement date (last close on or before it) times shares.
+# Yahoo closes are split-adjusted (even with auto_adjust=False) while share counts are
+# as reported, so closes are un-adjusted with the split history first. prices and
+# splits are wide (date x ticker) frames; splits holds split ratios (e.g. 10.0 for 10:1).
+# Split history is fetched along with prices; when passing adjusted prices, pass splits too.
+def attach_market_cap(history: pd.DataFrame, prices: pd.DataFrame | None = None, splits: pd.DataFrame | None = None) -> pd.DataFrame:
+    history = history.copy()
+    if history.empty:
+        history["market_cap"] = np.nan
+        return history
+
+    tickers = sorted(history["ticker"].unique())
+    if prices is None:
+        raw = yf.download(
+            tickers,
+            start=history["date"].min() - pd.Timedelta(days=10),
+            end=history["date"].max() + pd.Timedelta(days=1),
+            auto_adjust=False,
+            progress=False,
+        )
+        prices = raw["Close"] if isinstance(raw.columns, pd.MultiIndex) else raw[["Close"]].set_axis(
+            [history["ticker"].iloc[0]], axis=1
+        )
+        if splits is None:
+            splits = fetch_splits(tickers)
+
+    # Wide (date x ticker) closes -> long, then one as-of join for the whole panel
+    long_prices = _long_by_ticker(prices, "close", history["date"].dtype)
+    merged = pd.merge_asof(
+        history.sort_values("date"),
+        long_prices,
+        on="date",
+        by="ticker",
+        direction="backward",
+    )
+
+    # Unadjust factor at date d = product of split ratios with ex-date after d
+    factor = pd.Series(1.0, index=merged.index)
+    if splits is not None and not splits.empty:
+        long_splits = _long_by_ticker(splits, "ratio", history["date"].dtype)
+        long_splits = long_splits[long_splits["ratio"] > 0]
+        long_splits["applied"] = long_splits.groupby("ticker")["ratio"].cumprod()
+        total = long_splits.groupby("ticker")["ratio"].prod()
+        applied = pd.merge_asof(
+            merged[["date", "ticker"]],
+            long_splits[["date", "ticker", "applied"]],
+            on="date",
+            by="ticker",
+            direction="backward",
+        )["applied"].fillna(1.0)
+        factor = merged["ticker"].map(total).fillna(1.0) / applied.to_numpy()
+
+    merged["market_cap"] = merged["close"] * factor * merged["shares"]
+    return merged.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+
+# Assumptions for every (ticker, date) row, computed column-wise
+def derive_assumptions(history: pd.DataFrame, period: str = "quarterly") -> pd.DataFrame:
+    period = "quarterly" if period == "quarterly" else "annual"
+    step = PERIODS_PER_YEAR[period]
+    h = history.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+    # Contiguous runs: a gap outside the expected spacing (missing or irregular period) starts a new run
+    lo_days, hi_days = PERIOD_GAP_DAYS[period]
+    gap = pd.to_datetime(h["date"]).groupby(h["ticker"], sort=False).diff().dt.days
+    breaks = ~gap.between(lo_days, hi_days)
+    run = breaks.groupby(h["ticker"], sort=False).cumsum()
+    run_length = (h.groupby([h["ticker"], run], sort=False).cumcount() + 1).to_numpy()
+
+    # Trailing-twelve-month sums via grouped cumsum differences (no per-group Python)
+    # A TTM value needs step contiguous periods with no missing values in the window.
+    ttm = {}
+    for field in FLOW_FIELDS:
+        values = h[field]
+        if field == "ebitda":
+            values = values.fillna(h["ebit"] + h["da"].abs())
+        cs = values.fillna(0.0).groupby(h["ticker"], sort=False).cumsum()
+        count = values.notna().astype(int).groupby(h["ticker"], sort=False).cumsum()
+        window_sum = cs - cs.groupby(h["ticker"], sort=False).shift(step).fillna(0.0)
+        window_count = count - count.groupby(h["ticker"], sort=False).shift(step).fillna(0)
+        ttm[field] = window_sum.where((window_count == step) & (run_length >= step))
+
+    revenue = ttm["revenue"]
+    # Growth compares against the preceding window, so both TTMs must sit in one contiguous run
+    prior_revenue = revenue.groupby(h["ticker"], sort=False).shift(step).where(run_length >= 2 * step)
+    safe_revenue = revenue.where(revenue > 0)
+
+    raw_tax = (ttm["tax_expense"] / ttm["pretax_income"].where(ttm["pretax_income"] != 0)).abs()
+    tax_rate = raw_tax.clip(0.05, 0.40).fillna(0.25)
+
+    out = pd.DataFrame({
+        "ticker": h["ticker"],
+        "date": h["date"],
+        "revenue0": revenue,
+        "revenue_growth": (revenue / prior_revenue.where(prior_revenue > 0) - 1).clip(-0.5, 1.0),
+        "ebitda_margin": (ttm["ebitda"] / safe_revenue),
+        "da_pct_revenue": (ttm["da"].abs() / safe_revenue).fillna(0.05),
+        "capex_pct_revenue": (ttm["capex"].abs() / safe_revenue).fillna(0.05),
+        "nwc_pct_revenue": ((h["current_assets"] - h["current_liabilities"]) / safe_revenue).fillna(0.02),
+        "tax_rate": tax_rate,
+    })
+    if "market_cap" in h:
+        out["market_cap"] = h["market_cap"]
+    return out
+
+
+def run_backtest(
+        tickers=None,
+        period: str = "quarterly",
+        years: int = 5,
+        wacc=0.09,
+        exit_multiple=8.0,
+        history: pd.DataFrame | None = None,
+        prices: pd.DataFrame | None = None,
+        splits: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    if history is None:
+        history = build_history(tickers or [], period=period)
+    history = history.copy()
+
+    # wacc / exit_multiple may be scalars or per-row values for history: Series align on
+    # its index, arrays by position. They ride along as columns so every re-sort keeps them aligned.
+    per_row = {}
+    for name, value in (("wacc", wacc), ("exit_multiple", exit_multiple)):
+        if isinstance(value, (pd.Series, np.ndarray)):
+            per_row[name] = f"_{name}"
+            history[per_row[name]] = value if isinstance(value, pd.Series) else np.asarray(value, dtype=float)
+    history = history.reset_index(drop=True)
+
+    if "market_cap" not in history:
+        history = attach_market_cap(history, prices=prices, splits=splits)
+
+    assumptions = derive_assumptions(history, period=period)
+    valid = (
+        assumptions["revenue0"].gt(0)
+        & assumptions["ebitda_margin"].notna()
+        & assumptions["revenue_growth"].notna()
+    ).to_numpy()
+    panel = assumptions[valid].reset_index(drop=True)
+
+    # Same (ticker, date) order as derive_assumptions
+    ordered = history.sort_values(["ticker", "date"], kind="stable")
+    if "wacc" in per_row:
+        wacc = ordered[per_row["wacc"]].to_numpy(dtype=float)[valid]
+    if "exit_multiple" in per_row:
+        exit_multiple = ordered[per_row["exit_multiple"]].to_numpy(dtype=float)[valid]
+
+    forecast = forecast_fcff_batch(
+        revenue0=panel["revenue0"].to_numpy(),
+        years=years,
+        revenue_growth=panel["revenue_growth"].to_numpy(),
+        ebitda_margin=panel["ebitda_margin"].to_numpy(),
+        da_pct_revenue=panel["da_pct_revenue"].to_numpy(),
+        capex_pct_revenue=panel["capex_pct_revenue"].to_numpy(),
+        nwc_pct_revenue=panel["nwc_pct_revenue"].to_numpy(),
+        tax_rate=panel["tax_rate"].to_numpy(),
+    )
+    val = dcf_valuation_batch(forecast, wacc=wacc, exit_multiple=exit_multiple)
+
+    panel["Implied_EV"] = val["Enterprise_Value"]
+    panel["EV_to_Market_Cap"] = panel["Implied_EV"] / panel["market_cap"].where(panel["market_cap"] > 0)
+    return panel
+
+
+# Ticker x date matrix of any backtest column (e.g. Implied_EV, market_cap)
+def backtest_panel(results: pd.DataFrame, value: str = "EV_to_Market_Cap") -> pd.DataFrame:
+    return results.pivot(index="date", columns="ticker", values=value).sort_index()
+
+
+if __name__ == "__main__":
+    # Optional quick run (needs network access for yfinance)
+    out = run_backtest(["AAPL", "MSFT"], period="quarterly")
+    print(backtest_panel(out, "Implied_EV"))
+    print(backtest_panel(out, "market_cap"))
@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+
+# Server-side aggregation for Altair charts
+# Charts never receive more than CHART_POINT_BUDGET rows, so the Vega-Lite spec
+# stays the same size no matter how many draws / scenarios are behind it.
+
+CHART_POINT_BUDGET = 2_000  # Max rows sent to the browser per chart
+DEFAULT_QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+
+# Largest-Triangle-Three-Buckets line decimation, returns the kept indices
+def lttb_indices(x, y, max_points: int = CHART_POINT_BUDGET) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3 for LTTB decimation.")
+    if n <= max_points:
+        return np.arange(n)
+
+    # First and last points are always kept, the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    kept = np.empty(max_points, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    prev = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Average of the next bucket is the third triangle vertex
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+        else:
+            nlo, nhi = n - 1, n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs(
+            (x[prev] - avg_x) * (by - y[prev])
+            - (x[prev] - bx) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        kept[i + 1] = prev
+
+    return kept
+
+
+def downsample_line(
+        df: pd.DataFrame,
+        x: str,
+        y: str,
+        max_points: int = CHART_POINT_BUDGET,
+) -> pd.DataFrame:
+    if len(df) <= max_points:
+        return df
+    ordered = df.sort_values(x, kind="stable")
+    idx = lttb_indices(ordered[x].to_numpy(), ordered[y].to_numpy(), max_points=max_points)
+    return ordered.iloc[idx].reset_index(drop=True)
+
+
+# Histogram of a 1-D sample (e.g. simulated Enterprise Values), one row per bin
+def histogram_frame(
+        values,
+        bins: int = 50,
+        value_range: tuple[float, float] | None = None,
+        max_points: int = CHART_POINT_BUDGET,
+) -> pd.DataFrame:
+    values = np.asarray(values, dtype=float).ravel()
+    values = values[np.isfinite(values)]
+    bins = int(min(max(bins, 1), max(int(max_points), 1)))
+
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    total = counts.sum()
+
+    return pd.DataFrame({
+        "Bin_Start": edges[:-1],
+        "Bin_End": edges[1:],
+        "Count": counts,
+        "Share": counts / total if total else np.zeros_like(counts, dtype=float),
+    })
+
+
+# Percentile fan across draws: draws is (n_draws x n_points), x has n_points entries
+def quantile_bands(
+        x,
+        draws,
+        quantiles=DEFAULT_QUANTILES,
+        max_points: int = CHART_POINT_BUDGET,
+        x_name: str = "Year",
+) -> pd.DataFrame:
+    x = np.asarray(x, dtype=float)
+    draws = np.atleast_2d(np.asarray(draws, dtype=float))
+    if draws.shape[1] != len(x):
+        raise ValueError("draws must have one column per x value.")
+
+    bands = np.nanquantile(draws, quantiles, axis=0)
+    out = pd.DataFrame({x_name: x})
+    for q, band in zip(quantiles, bands):
+        out[f"q{int(round(q * 100)):02d}"] = band
+
+    # Decimate on the median so every band keeps the same x positions
+    if len(out) > max_points:
+        mid = int(np.argmin(np.abs(np.asarray(quantiles) - 0.5)))
+        idx = lttb_indices(x, bands[mid], max_points=max_points)
+        out = out.iloc[idx].reset_index(drop=True)
+
+    return out
+
+
+# Dense 2-D surfaces (sensitivity grids) are pooled down to fit the budget
+def downsample_grid(
+        grid: pd.DataFrame,
+        max_points: int = CHART_POINT_BUDGET,
+) -> pd.DataFrame:
+    n_rows, n_cols = grid.shape
+    if n_rows * n_cols <= max_points:
+        return grid
+
+    # Largest pooled grid with ceil(rows / row_step) * ceil(cols / col_step) <= max_points
+    best = None
+    for row_step in range(1, n_rows + 1):
+        out_rows = -(-n_rows // row_step)
+        max_cols = max_points // out_rows
+        if max_cols < 1:
+            continue
+        col_step = -(-n_cols // max_cols)
+        cells = out_rows * -(-n_cols // col_step)
+        rank = (cells, -abs(row_step - col_step))
+        if best is None or rank > best[0]:
+            best = (rank, row_step, col_step)
+    _, row_step, col_step = best
+
+    values = grid.to_numpy(dtype=float)
+    row_groups = np.arange(n_rows) // row_step
+    col_groups = np.arange(n_cols) // col_step
+
+    # Block means via group-by on both axes
+    pooled = (
+        pd.DataFrame(values)
+        .groupby(row_groups).mean()
+        .T.groupby(col_groups).mean().T
+    )
+    pooled.index = pd.Series(grid.index[::row_step]).to_numpy()
+    pooled.columns = pd.Series(grid.columns[::col_step]).to_numpy()
+    pooled.index.name = grid.index.name
+    pooled.columns.name = grid.columns.name
+    return pooled
@@ -4,8 +4,24 @@ import os
 import time
 import requests
 
-# FRED Risk Free Rate Fetch (cache)
-_FRED_CACHE = {"ts": 0.0, "value": None}
+from statement_cache import STATEMENT_CACHE
+
+# yfinance attribute per statement and period
+STATEMENT_ATTRS = {
+    "annual": {
+        "income_statement": "financials",
+        "balance_sheet": "balance_sheet",
+        "cashflow_statement": "cashflow",
+    },
+    "quarterly": {
+        "income_statement": "quarterly_financials",
+        "balance_sheet": "quarterly_balance_sheet",
+        "cashflow_statement": "quarterly_cashflow",
+    },
+}
+
+# FRED Risk Free Rate Fetch (cache per series)
+_FRED_CACHE = {}
 
 def get_risk_free_rate_fred(
         series_id: str = "DGS10", # 10-Year Treasury Constant Maturity Rate
@@ -15,8 +31,9 @@ def get_risk_free_rate_fred(
 
 # Gets RiskFreeRate as decimal 
     now = time.time()
-    if _FRED_CACHE["value"] is not None and (now - _FRED_CACHE["ts"]) < cache_ttl_seconds:
-        return _FRED_CACHE["value"]
+    cached = _FRED_CACHE.get(series_id)
+    if cached is not None and (now - cached["ts"]) < cache_ttl_seconds:
+        return cached["value"]
     
     api_key = api_key or os.getenv("FRED_API_KEY")
     if not api_key:
@@ -55,18 +72,40 @@ def get_risk_free_rate_fred(
     # Convert to decimal
     rf = latest_val / 100.0
 
-    _FRED_CACHE["ts"] = now
-    _FRED_CACHE["value"] = rf
+    _FRED_CACHE[series_id] = {"ts": now, "value": rf}
     return rf
 
+# Treasury constant-maturity curve (maturity in years -> yield as decimal)
+TREASURY_CURVE_SERIES = {
+    1.0: "DGS1",
+    2.0: "DGS2",
+    3.0: "DGS3",
+    5.0: "DGS5",
+    7.0: "DGS7",
+    10.0: "DGS10",
+    20.0: "DGS20",
+    30.0: "DGS30",
+}
+
+def get_treasury_curve_fred(api_key: str | None = None) -> pd.Series:
+    curve = {}
+    for maturity, series_id in TREASURY_CURVE_SERIES.items():
+        try:
+            curve[maturity] = get_risk_free_rate_fred(series_id=series_id, api_key=api_key)
+        except Exception as e:
+            print(f"Warning: Could not fetch {series_id} from FRED: {e}")
+    if not curve:
+        raise ValueError("No Treasury curve points could be fetched from FRED.")
+    return pd.Series(curve, name="yield").rename_axis("maturity_years")
+
 # Fetch company info from YahooFinance
 def get_company_financials(ticker) -> dict:
     try: 
         company = yf.Ticker(ticker)
         info = company.info
-        financials = company.financials if isinstance(company.financials, pd.DataFrame) else pd.DataFrame()
-        cashflow = getattr(company, "cashflow", pd.DataFrame())
-        balance_sheet = getattr(company, "balance_sheet", pd.DataFrame())
+        financials = load_statement(statement_key(ticker, "annual", "income_statement"), company=company)
+        cashflow = load_statement(statement_key(ticker, "annual", "cashflow_statement"), company=company)
+        balance_sheet = load_statement(statement_key(ticker, "annual", "balance_sheet"), company=company)
 
 # yfinance Error Handling
         if company is None:
@@ -243,6 +282,8 @@ def get_company_financials(ticker) -> dict:
         return {
             "ticker": ticker.upper(),
             "company_name": info.get("longName", "N/A"),
+            "sector": info.get("sector"),
+            "industry": info.get("industry"),
             "revenue": revenue,
             "ebitda": ebitda,
             "net_income": net_income,
@@ -280,6 +321,8 @@ def create_assumptions_from_ticker(ticker):
         "ticker": data["ticker"],
         "company_name": data["company_name"],
         "currency": data["currency"],
+        "sector": data.get("sector"),
+        "industry": data.get("industry"),
     }
     
     revenue = float(data.get("revenue", 0) or 0)
@@ -314,40 +357,71 @@ def create_assumptions_from_ticker(ticker):
 
     return metadata, assumptions
 
-# Fetch raw statements
+# Shared statement cache keys
+def statement_key(ticker: str, period: str, statement: str) -> tuple:
+    period = "quarterly" if period == "quarterly" else "annual"
+    return (ticker.upper(), period, statement)
 
-def fetch_statements_raw(ticker:str, period: str = "annual") -> dict:
-    t = yf.Ticker(ticker)
 
-    if period == "quarterly":
-        income_statement = getattr(t, "quarterly_financials", pd.DataFrame())
-        balance_sheet = getattr(t, "quarterly_balance_sheet", pd.DataFrame())
-        cashflow_statement = getattr(t, "quarterly_cashflow", pd.DataFrame())
-    else:
-        income_statement = getattr(t, "financials", pd.DataFrame())
-        balance_sheet = getattr(t, "balance_sheet", pd.DataFrame())
-        cashflow_statement = getattr(t, "cashflow", pd.DataFrame())
+# Resolve a statement key from the shared cache, fetching from yfinance on a miss
+def load_statement(key: tuple, owner=None, company=None, refresh: bool = False) -> pd.DataFrame:
+    ticker, period, statement = key
+
+    def _fetch():
+        t = company if company is not None else yf.Ticker(ticker)
+        df = getattr(t, STATEMENT_ATTRS[period][statement], pd.DataFrame())
+        return df if isinstance(df, pd.DataFrame) else pd.DataFrame()
+
+    return STATEMENT_CACHE.get_or_load(key, _fetch, owner=owner, refresh=refresh)
 
+
+def _statement_meta(t, ticker: str, period: str) -> dict:
     info = getattr(t, "info", {}) or {}
     company_name = info.get("longName", "N/A"), info.get("shortName", "N/A")
     currency = info.get("currency", "N/A")
 
     return {
-        "meta": {
-            "ticker": ticker.upper(),
-            "company_name": company_name,
-            "currency": currency,
-            "source": "yfinance",
-            "period": period,
-        },
+        "ticker": ticker.upper(),
+        "company_name": company_name,
+        "currency": currency,
+        "source": "yfinance",
+        "period": period,
+    }
+
+
+# Fetch raw statements
+
+def fetch_statements_raw(ticker:str, period: str = "annual") -> dict:
+    t = yf.Ticker(ticker)
+    period = "quarterly" if period == "quarterly" else "annual"
+
+    return {
+        "meta": _statement_meta(t, ticker, period),
         "statements": {
-            "income_statement": income_statement if isinstance(income_statement, pd.DataFrame) else pd.DataFrame(),
-            "balance_sheet": balance_sheet if isinstance(balance_sheet, pd.DataFrame) else pd.DataFrame(),
-            "cashflow_statement": cashflow_statement if isinstance(cashflow_statement, pd.DataFrame) else pd.DataFrame(),
+            name: load_statement(statement_key(ticker, period, name), company=t)
+            for name in STATEMENT_ATTRS[period]
         }
     }
 
 
+# Same as fetch_statements_raw, but statements are cache keys (for session_state)
+# Resolve them with load_statement(key, owner) when rendering.
+def fetch_statement_keys(ticker: str, period: str = "annual", owner=None, refresh: bool = False) -> dict:
+    t = yf.Ticker(ticker)
+    period = "quarterly" if period == "quarterly" else "annual"
+
+    keys = {}
+    for name in STATEMENT_ATTRS[period]:
+        key = statement_key(ticker, period, name)
+        load_statement(key, owner=owner, company=t, refresh=refresh)
+        keys[name] = key
+
+    return {
+        "meta": _statement_meta(t, ticker, period),
+        "statement_keys": keys,
+    }
+
+
 if __name__ == "__main__":
     print(f"get_company_financials: {get_company_financials('AAPL')}")
 
@@ -0,0 +1,204 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+
+from model import SENSITIVITY_INPUTS, dcf_valuation_with_sensitivities
+from result_store import stored_forecast_fcff
+from peers import get_peer_index, seed_exit_multiple
+
+# Off-thread model execution for the Streamlit app
+# Every job runs in a process-wide thread pool instead of the script thread. Each
+# session keeps one job per slot ("simulation", "grid", ...): submitting new inputs
+# supersedes the previous job, which is cancelled if it hasn't started or has its
+# result dropped if it has. The last good result stays available meanwhile.
+# Debounce windows are kept on one timer thread, so only jobs whose inputs have
+# settled ever occupy a pool worker.
+
+EXECUTOR_THREADS = int(os.getenv("EXECUTOR_THREADS", 8))
+DEFAULT_DEBOUNCE_SECONDS = 0.3
+
+_POOL_LOCK = threading.Lock()
+_THREAD_POOL = None
+
+
+def thread_pool() -> ThreadPoolExecutor:
+    global _THREAD_POOL
+    with _POOL_LOCK:
+        if _THREAD_POOL is None:
+            _THREAD_POOL = ThreadPoolExecutor(max_workers=EXECUTOR_THREADS, thread_name_prefix="model-job")
+        return _THREAD_POOL
+
+
+# Single timer thread for every session's debounce windows (a heap of due callbacks)
+class _Debouncer:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+
+    def schedule(self, delay: float, callback):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), callback))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="model-job-debounce", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, callback = heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception as e:
+                print({"Warning": f"Debounced job dispatch failed: {e}"})
+
+
+_DEBOUNCER = _Debouncer()
+
+
+class Superseded(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key):
+        self.key = key
+        self.submitted = time.time()
+        self.cancelled = threading.Event()
+        self.future = Future()  # Pending while debouncing, then mirrors the pool future
+        self._inner = None
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()  # Succeeds only while still debouncing
+        inner = self._inner
+        if inner is not None:
+            inner.cancel()  # Succeeds only while queued in the pool
+
+    # Hand the job to the pool once its inputs have settled
+    def _start(self, fn, args, kwargs):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        self._inner = thread_pool().submit(self._run, fn, args, kwargs)
+        self._inner.add_done_callback(self._settle)
+
+    def _run(self, fn, args, kwargs):
+        if self.cancelled.is_set():
+            raise Superseded()
+        result = fn(*args, **kwargs)
+        if self.cancelled.is_set():
+            raise Superseded()
+        return result
+
+    def _settle(self, inner):
+        if inner.cancelled():
+            self.future.set_exception(Superseded())
+        elif inner.exception() is not None:
+            self.future.set_exception(inner.exception())
+        else:
+            self.future.set_result(inner.result())
+
+
+# Per-session job slots (stored in st.session_state)
+class SessionJobs:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._last_good = {}  # slot -> (key, result)
+        self._errors = {}  # slot -> exception from the latest job, until the next submit
+
+    def submit(self, slot: str, fn, *args, key=None,
+               debounce: float = DEFAULT_DEBOUNCE_SECONDS, **kwargs) -> Job | None:
+        with self._lock:
+            current = self._jobs.get(slot)
+            # Same inputs already queued/running/done: nothing to do
+            if current is not None and key is not None and current.key == key and not current.cancelled.is_set():
+                return current
+            # Back to inputs whose result we already have: drop the pending job
+            if key is not None and slot in self._last_good and self._last_good[slot][0] == key:
+                if current is not None:
+                    current.cancel()
+                    del self._jobs[slot]
+                return None
+
+            if current is not None:
+                current.cancel()
+            self._errors.pop(slot, None)
+
+            job = Job(key)
+            self._jobs[slot] = job
+
+        if debounce > 0:
+            _DEBOUNCER.schedule(debounce, lambda: job._start(fn, args, kwargs))
+        else:
+            job._start(fn, args, kwargs)
+        return job
+
+    def cancel(self, slot: str):
+        with self._lock:
+            job = self._jobs.pop(slot, None)
+        if job is not None:
+            job.cancel()
+
+    # state is "idle", "running" or "done"; result is always the last good one
+    def status(self, slot: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(slot)
+            if job is not None and job.future.done():
+                try:
+                    self._last_good[slot] = (job.key, job.future.result())
+                except (Superseded, CancelledError):
+                    pass
+                except Exception as e:
+                    self._errors[slot] = e
+                del self._jobs[slot]
+                job = None
+
+            key, result = self._last_good.get(slot, (None, None))
+            return {
+                "state": "running" if job is not None else ("done" if slot in self._last_good else "idle"),
+                "key": key,
+                "result": result,
+                "error": self._errors.get(slot),
+                "elapsed": time.time() - job.submitted if job is not None else 0.0,
+                "pending_key": job.key if job is not None else None,
+            }
+
+
+# Hashable key of an assumption dict, for superseding jobs
+def assumption_key(assumptions: dict) -> tuple:
+    return tuple(sorted((k, v) for k, v in assumptions.items() if isinstance(v, (int, float, str, bool))))
+
+
+def simulation_job(a: dict) -> dict:
+    fcff_forecast = stored_forecast_fcff(
+        revenue0=a["revenue0"],
+        years=a["years"],
+        revenue_growth=a["revenue_growth"],
+        ebitda_margin=a["ebitda_margin"],
+        da_pct_revenue=a["da_pct_revenue"],
+        capex_pct_revenue=a["capex_pct_revenue"],
+        nwc_pct_revenue=a["nwc_pct_revenue"],
+        tax_rate=a["tax_rate"],
+    )
+    # Valuation and its sensitivities come from one batched pass
+    sens_inputs = {name: float(a[name]) for name in SENSITIVITY_INPUTS}
+    val, sens = dcf_valuation_with_sensitivities(years=int(a["years"]), **sens_inputs)
+    return {
+        "fcff_forecast": fcff_forecast,
+        "val": val,
+        "sens": sens,
+        "sens_base": sens_inputs,
+    }
+
+
+# Peer index build is network bound (one info call per ticker), so it runs as a job too
+def peer_seed_job(tickers, sector=None, industry=None) -> dict:
+    return seed_exit_multiple(get_peer_index(tickers), sector=sector, industry=industry)
@@ -0,0 +1,185 @@
+import pandas as pd
+import io
+import os
+import csv
+import tempfile
+from typing import Callable, Iterable, Iterator
+
+# Streaming export of model outputs (forecasts, grids, draws, screens)
+# Every writer consumes an iterable of DataFrame chunks, so only one chunk is
+# ever held in memory regardless of how many rows the full result has.
+
+EXPORT_FORMATS = ("csv", "parquet", "xlsx")
+EXPORT_CHUNK_ROWS = 100_000
+EXCEL_MAX_ROWS = 1_048_575  # Excel sheet limit minus the header row
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# Split an existing frame into row chunks without copying it
+def frame_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# Sensitivity grids are exported long-form: one row per (row, column) cell
+def grid_chunks(grid: pd.DataFrame, value_name: str = "Value", chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    row_name = grid.index.name or "Row"
+    col_name = grid.columns.name or "Column"
+    rows_per_chunk = max(chunk_rows // max(grid.shape[1], 1), 1)
+
+    for start in range(0, len(grid), rows_per_chunk):
+        block = grid.iloc[start:start + rows_per_chunk]
+        long = block.rename_axis(index=row_name, columns=col_name).stack().rename(value_name)
+        yield long.reset_index()
+
+
+def _as_chunks(data) -> Iterable[pd.DataFrame]:
+    if isinstance(data, pd.DataFrame):
+        return frame_chunks(data)
+    return data
+
+
+def _write_csv(chunks: Iterable[pd.DataFrame], out) -> int:
+    rows = 0
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(out, index=False, header=header, quoting=csv.QUOTE_MINIMAL)
+        header = False
+        rows += len(chunk)
+    return rows
+
+
+# Numeric columns go out as float64, so an int column that later picks up NaN keeps one type
+def _normalize_numeric(chunk: pd.DataFrame) -> pd.DataFrame:
+    numeric = [
+        c for c in chunk.columns
+        if pd.api.types.is_numeric_dtype(chunk[c]) and not pd.api.types.is_bool_dtype(chunk[c])
+    ]
+    if not numeric:
+        return chunk
+    return chunk.astype({c: "float64" for c in numeric})
+
+
+def _write_parquet(chunks: Iterable[pd.DataFrame], out, schema=None) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow. Install it with `pip install pyarrow`.") from e
+
+    rows = 0
+    writer = None
+    pending = []  # Tables held back while some column is still all-null
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(_normalize_numeric(chunk), preserve_index=False)
+            rows += len(chunk)
+            if writer is None and schema is not None and not any(pa.types.is_null(f.type) for f in schema):
+                writer = pq.ParquetWriter(out, schema)
+            if writer is not None:
+                writer.write_table(table.cast(writer.schema))
+                continue
+
+            # No fixed schema yet: null columns take the type of the first chunk that has values
+            schema = table.schema if schema is None else pa.unify_schemas([schema, table.schema], promote_options="default")
+            pending.append(table)
+            if not any(pa.types.is_null(f.type) for f in schema):
+                writer = pq.ParquetWriter(out, schema)
+                for held in pending:
+                    writer.write_table(held.cast(schema))
+                pending = []
+
+        # Columns that stayed null throughout are written as null columns
+        if writer is None and schema is not None:
+            writer = pq.ParquetWriter(out, schema)
+            for held in pending:
+                writer.write_table(held.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _write_xlsx(chunks: Iterable[pd.DataFrame], out, sheet_name: str = "Export") -> int:
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ImportError("Excel export requires openpyxl. Install it with `pip install openpyxl`.") from e
+
+    # write_only workbooks stream rows to disk instead of building a cell tree
+    wb = Workbook(write_only=True)
+    ws = None
+    sheet_rows = 0
+    sheet_no = 0
+    columns = None
+    rows = 0
+
+    for chunk in chunks:
+        if columns is None:
+            columns = [str(c) for c in chunk.columns]
+        for record in chunk.itertuples(index=False, name=None):
+            # Roll over to a new sheet at Excel's row limit
+            if ws is None or sheet_rows >= EXCEL_MAX_ROWS:
+                sheet_no += 1
+                ws = wb.create_sheet(sheet_name if sheet_no == 1 else f"{sheet_name}_{sheet_no}")
+                ws.append(columns)
+                sheet_rows = 0
+            ws.append([None if pd.isna(v) else v for v in record])
+            sheet_rows += 1
+            rows += 1
+
+    if ws is None:
+        ws = wb.create_sheet(sheet_name)
+        if columns:
+            ws.append(columns)
+
+    wb.save(out)
+    return rows
+
+
+# Python entry point: path (or writable binary buffer) + format, returns rows written
+# schema (pyarrow.Schema) pins the Parquet column types, otherwise they are inferred
+def export_chunks(data, out, fmt: str = "csv", sheet_name: str = "Export", schema=None) -> int:
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}. Choose one of {EXPORT_FORMATS}.")
+
+    chunks = _as_chunks(data)
+
+    if fmt == "csv":
+        if isinstance(out, (str, os.PathLike)):
+            with open(out, "w", newline="", encoding="utf-8") as f:
+                return _write_csv(chunks, f)
+        # Binary buffers (download buttons, spooled files) get a text wrapper
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        try:
+            return _write_csv(chunks, text)
+        finally:
+            text.detach()
+    if fmt == "parquet":
+        return _write_parquet(chunks, out, schema=schema)
+    return _write_xlsx(chunks, out, sheet_name=sheet_name)
+
+
+# Streamlit download buttons accept a callable, so the file is only built on click.
+# Output is written to a named temp file and handed back as an open binary reader
+# (a type st.download_button accepts); the path is unlinked once it is open.
+def export_download(chunks_factory: Callable[[], Iterable[pd.DataFrame]], fmt: str = "csv", sheet_name: str = "Export") -> Callable:
+    def _build():
+        with tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False) as tmp:
+            path = tmp.name
+        try:
+            export_chunks(chunks_factory(), path, fmt=fmt, sheet_name=sheet_name)
+            reader = open(path, "rb")
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Windows keeps open files; the OS temp dir cleans it up
+        return reader
+    return _build
@@ -0,0 +1,378 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+import time
+import zlib
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from unittest import mock
+
+# Concurrent-session load test for app.py
+# Drives the dashboard headlessly with Streamlit's AppTest (one AppTest = one
+# session) against local stubs of yfinance and FRED, scripts realistic
+# interactions and reports rerun latency percentiles, throughput and RSS per
+# worker process as the session count scales.
+#
+#   python loadtest.py --sessions 1 5 10 25 --processes 2 --iterations 3
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+STUB_TICKERS = ("AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "JPM", "XOM")
+SIM_POLL_SECONDS = 0.05
+SIM_TIMEOUT_SECONDS = 30
+RERUN_TIMEOUT_SECONDS = 60
+LOADTEST_PROCESSES = 2  # Fixed worker count, so sessions per process grow with the sweep
+
+_APPTEST_LOCK = threading.Lock()
+
+
+# ---------------------------
+# Stubs for yfinance and FRED
+# ---------------------------
+def _stub_statements(ticker: str, periods: int, freq: str) -> dict:
+    rng = np.random.default_rng(zlib.crc32(f"{ticker}-{freq}".encode()))
+    dates = pd.date_range(end="2025-12-31", periods=periods, freq=freq)[::-1]  # yfinance: newest first
+    scale = 4 if freq == "QE" else 1
+    revenue = rng.uniform(5e10, 4e11, periods) / scale
+    ebitda = revenue * rng.uniform(0.15, 0.40, periods)
+    da = revenue * rng.uniform(0.02, 0.06, periods)
+    pretax = (ebitda - da) * 0.95
+
+    income = pd.DataFrame({
+        "Total Revenue": revenue,
+        "EBITDA": ebitda,
+        "Operating Income": ebitda - da,
+        "Pretax Income": pretax,
+        "Tax Provision": pretax * rng.uniform(0.12, 0.25, periods),
+        "Net Income": pretax * 0.8,
+        "Interest Expense": revenue * 0.005,
+    }, index=dates).T
+    cashflow = pd.DataFrame({
+        "Depreciation And Amortization": da,
+        "Capital Expenditure": -revenue * rng.uniform(0.03, 0.08, periods),
+    }, index=dates).T
+    balance = pd.DataFrame({
+        "Current Assets": revenue * 0.6 * scale,
+        "Current Liabilities": revenue * 0.5 * scale,
+        "Total Debt": revenue * 0.4 * scale,
+        "Ordinary Shares Number": np.full(periods, 1.5e10),
+    }, index=dates).T
+    return {"financials": income, "cashflow": cashflow, "balance_sheet": balance}
+
+
+class StubTicker:
+    def __init__(self, ticker: str):
+        self.ticker = ticker.upper()
+        rng = np.random.default_rng(zlib.crc32(self.ticker.encode()))
+        annual = _stub_statements(self.ticker, 4, "YE")
+        quarterly = _stub_statements(self.ticker, 8, "QE")
+
+        self.financials = annual["financials"]
+        self.cashflow = annual["cashflow"]
+        self.balance_sheet = annual["balance_sheet"]
+        self.quarterly_financials = quarterly["financials"]
+        self.quarterly_cashflow = quarterly["cashflow"]
+        self.quarterly_balance_sheet = quarterly["balance_sheet"]
+        self.info = {
+            "longName": f"{self.ticker} Stub Corp.",
+            "shortName": self.ticker,
+            "currency": "USD",
+            "marketCap": float(rng.uniform(2e11, 3e12)),
+            "beta": float(rng.uniform(0.7, 1.6)),
+            "totalDebt": float(self.balance_sheet.loc["Total Debt"].iloc[0]),
+            "interestExpense": float(self.financials.loc["Interest Expense"].iloc[0]),
+            "sector": "Technology",
+            "industry": "Stub Software",
+            "ebitda": float(self.financials.loc["EBITDA"].iloc[0]),
+            "totalRevenue": float(self.financials.loc["Total Revenue"].iloc[0]),
+        }
+        self.info["enterpriseValue"] = self.info["marketCap"] + self.info["totalDebt"]
+
+
+class _StubResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def stub_fred_get(url, params=None, timeout=None, **kwargs):
+    return _StubResponse({"observations": [{"date": "2025-12-31", "value": "4.25"}]})
+
+
+@contextmanager
+def stubbed_data_sources():
+    import data_fetcher
+
+    with mock.patch("yfinance.Ticker", StubTicker), \
+            mock.patch.object(data_fetcher.requests, "get", stub_fred_get), \
+            mock.patch.dict(os.environ, {"FRED_API_KEY": "stub"}):
+        data_fetcher._FRED_CACHE.clear()
+        yield
+
+
+# Streamlit's server compiles app.py once per process; each AppTest has its own
+# ScriptCache, and concurrent ast.parse calls are not thread-safe on CPython 3.11.
+# Sharing one cache matches production and avoids both.
+@contextmanager
+def shared_script_cache():
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    shared = ScriptCache()
+    original = ScriptCache.get_bytecode
+    with mock.patch.object(ScriptCache, "get_bytecode", lambda self, path: original(shared, path)):
+        yield
+
+
+# ---------------------------
+# Scripted session
+# ---------------------------
+class SessionDriver:
+    def __init__(self, session_id: int, seed: int):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.rng = np.random.default_rng(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS)
+        self.records = []
+        self._lock_wait_s = 0.0  # Per action: time queued behind other sessions' runs
+        self._run_s = 0.0  # Per action: time spent inside AppTest.run
+
+    def _timed(self, action: str, fn):
+        self._lock_wait_s = 0.0
+        self._run_s = 0.0
+        start = time.perf_counter()
+        reruns = 1
+        error = None
+        try:
+            out = fn()
+            reruns = out if isinstance(out, int) else 1
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if error is None and len(self.at.exception):
+            error = self.at.exception[0].message
+        self.records.append({
+            "session": self.session_id,
+            "action": action,
+            "latency_s": time.perf_counter() - start,
+            "lock_wait_s": self._lock_wait_s,
+            "run_s": self._run_s,
+            "reruns": reruns,
+            "error": error,
+        })
+
+    # AppTest installs a process-global Runtime for each run, so runs within one
+    # worker process are serialized; cross-session concurrency comes from processes
+    # and from executor jobs that keep running between reruns. Lock wait and run time
+    # are also recorded separately, to split wall latency into queueing and app time.
+    def _run(self):
+        queued = time.perf_counter()
+        with _APPTEST_LOCK:
+            started = time.perf_counter()
+            self._lock_wait_s += started - queued
+            try:
+                self.at.run()
+            finally:
+                self._run_s += time.perf_counter() - started
+
+    def _widget(self, group, label):
+        return next(w for w in getattr(self.at, group) if w.label == label)
+
+    def open(self):
+        self._timed("initial_render", lambda: self._run())
+
+    def load_ticker(self, ticker: str):
+        def _go():
+            self.at.text_input[0].set_value(ticker)
+            self._widget("button", "Load Ticker Data").click()
+            self._run()
+        self._timed("load_ticker", _go)
+
+    def move_sliders(self, moves: int = 3):
+        specs = (
+            ("Revenue Growth Rate", 0.0, 0.5, 0.01),
+            ("EBITDA Margin", 0.05, 0.6, 0.01),
+            ("WACC", 0.05, 0.2, 0.005),
+        )
+        for _ in range(moves):
+            label, lo, hi, step = specs[self.rng.integers(len(specs))]
+            value = round(float(self.rng.uniform(lo, hi)) / step) * step
+
+            def _go(label=label, value=value):
+                self._widget("slider", label).set_value(value)
+                self._run()
+            self._timed("move_slider", _go)
+
+    def run_simulation(self):
+        def _go():
+            self._widget("button", "Run Simulation").click()
+            self._run()
+            reruns = 1
+            deadline = time.perf_counter() + SIM_TIMEOUT_SECONDS
+            # Result lands on a later rerun (executor.py runs it off the script thread)
+            while not any(m.label == "Enterprise Value" for m in self.at.metric):
+                if time.perf_counter() > deadline:
+                    raise TimeoutError("simulation result did not appear")
+                time.sleep(SIM_POLL_SECONDS)
+                self._run()
+                reruns += 1
+            return reruns
+        self._timed("run_simulation", _go)
+
+    def toggle_period(self):
+        radios = [r for r in self.at.radio if r.label == "Statement Period"]
+        if not radios:
+            return
+        target = "Quarterly" if radios[0].value == "Annual" else "Annual"
+
+        def _go():
+            radios[0].set_value(target)
+            self._run()
+        self._timed("toggle_period", _go)
+
+    def script(self, iterations: int = 1):
+        self.open()
+        for _ in range(iterations):
+            self.load_ticker(str(self.rng.choice(STUB_TICKERS)))
+            self.move_sliders()
+            self.run_simulation()
+            self.toggle_period()
+            self.toggle_period()
+        return self.records
+
+
+# ---------------------------
+# Workers and reporting
+# ---------------------------
+def process_rss_bytes() -> int:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+# One worker process: runs its share of sessions concurrently in threads
+def _worker(args) -> dict:
+    session_ids, iterations, seed = args
+    peak = {"rss": process_rss_bytes()}
+    stop = threading.Event()
+
+    def _sample():
+        while not stop.wait(0.2):
+            peak["rss"] = max(peak["rss"], process_rss_bytes())
+
+    sampler = threading.Thread(target=_sample, daemon=True)
+    sampler.start()
+
+    records = []
+    with stubbed_data_sources(), shared_script_cache():
+        with ThreadPoolExecutor(max_workers=max(len(session_ids), 1)) as pool:
+            futures = [
+                pool.submit(lambda sid: SessionDriver(sid, seed + sid).script(iterations), sid)
+                for sid in session_ids
+            ]
+            for f in futures:
+                records.extend(f.result())
+
+    stop.set()
+    sampler.join()
+    return {"pid": os.getpid(), "records": records, "rss_bytes": process_rss_bytes(), "peak_rss_bytes": peak["rss"]}
+
+
+def run_load_test(sessions: int, processes: int = LOADTEST_PROCESSES, iterations: int = 1, seed: int = 0) -> dict:
+    # Only fewer processes than requested when there are fewer sessions than processes
+    processes = max(min(processes, sessions), 1)
+    shards = [list(range(p, sessions, processes)) for p in range(processes)]
+
+    # Sessions always run in fresh worker processes: keeps RSS per run comparable and
+    # keeps AppTest (which swaps sys.modules["__main__"]) out of the parent process
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(_worker, [(s, iterations, seed) for s in shards]))
+        wall = time.perf_counter() - start
+
+    records = pd.DataFrame([r for res in results for r in res["records"]])
+    memory = pd.DataFrame([
+        {"pid": r["pid"], "sessions": len(s), "rss_mb": r["rss_bytes"] / 2**20, "peak_rss_mb": r["peak_rss_bytes"] / 2**20}
+        for r, s in zip(results, shards)
+    ])
+    return {"sessions": sessions, "processes": processes, "wall_s": wall, "records": records, "memory": memory}
+
+
+def summarize(run: dict) -> pd.DataFrame:
+    rec = run["records"]
+    if rec.empty:
+        return pd.DataFrame()
+
+    # Headline percentiles are wall latency (queueing behind other sessions included);
+    # in-lock run time and lock wait break it down
+    def _row(df, action):
+        p50, p95, p99 = np.percentile(df["latency_s"].to_numpy(), [50, 95, 99])
+        return {
+            "sessions": run["sessions"],
+            "sessions_per_process": run["sessions"] / run["processes"],
+            "action": action,
+            "count": len(df),
+            "errors": int(df["error"].notna().sum()),
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "p95_run_ms": np.percentile(df["run_s"].to_numpy(), 95) * 1000,
+            "mean_lock_wait_ms": df["lock_wait_s"].mean() * 1000,
+        }
+
+    rows = [_row(df, action) for action, df in rec.groupby("action", sort=True)]
+    overall = _row(rec, "ALL")
+    overall["reruns_per_s"] = rec["reruns"].sum() / run["wall_s"]
+    overall["actions_per_s"] = len(rec) / run["wall_s"]
+    overall["max_rss_mb"] = run["memory"]["peak_rss_mb"].max()
+    overall["mean_rss_mb"] = run["memory"]["rss_mb"].mean()
+    rows.append(overall)
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit dashboard.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--processes", type=int, default=LOADTEST_PROCESSES,
+                        help="Worker processes, fixed across the --sessions sweep")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="Optional path for the raw per-action records")
+    args = parser.parse_args(argv)
+
+    # Keep load-test results out of the real persistent result store
+    os.environ.setdefault("RESULT_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="mna-loadtest-"), "results.sqlite"))
+
+    summaries, raw = [], []
+    for n in args.sessions:
+        run = run_load_test(n, processes=args.processes, iterations=args.iterations, seed=args.seed)
+        summaries.append(summarize(run))
+        raw.append(run["records"].assign(sessions=n))
+        print(f"{n} sessions: {run['wall_s']:.1f}s wall, {len(run['records'])} actions")
+
+    report = pd.concat(summaries, ignore_index=True)
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(report.round(2).to_string(index=False))
+    if args.csv:
+        pd.concat(raw, ignore_index=True).to_csv(args.csv, index=False)
+    return report
+
+
+if __name__ == "__main__":
+    main()
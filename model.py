@@ -1,37 +1,109 @@
 import pandas as pd
 import numpy as np
 
+# Bump whenever model math changes so persisted results (result_store.py) are not reused
+MODEL_VERSION = "2"
+
 # Data_fetched from Yahoo Finance
 # Tax Rate Calc
 
 def forecast_fcff(
     revenue0: float,
     years: int,
-    revenue_growth: float,
-    ebitda_margin: float,
-    da_pct_revenue: float,
-    capex_pct_revenue: float,
-    nwc_pct_revenue: float,
-    tax_rate: float,
+    revenue_growth,
+    ebitda_margin,
+    da_pct_revenue,
+    capex_pct_revenue,
+    nwc_pct_revenue,
+    tax_rate,
 ) -> pd.DataFrame:
+    # Rates may be constants or per-year sequences of length `years` (fade paths, ramps)
+    per_year = lambda x: np.asarray(x, dtype=float)[None, :] if np.ndim(x) == 1 else x
+    out = forecast_fcff_batch(
+        revenue0=revenue0,
+        years=years,
+        revenue_growth=per_year(revenue_growth),
+        ebitda_margin=per_year(ebitda_margin),
+        da_pct_revenue=per_year(da_pct_revenue),
+        capex_pct_revenue=per_year(capex_pct_revenue),
+        nwc_pct_revenue=per_year(nwc_pct_revenue),
+        tax_rate=per_year(tax_rate),
+    )
+
+    return pd.DataFrame({
+        "Year": out["Year"],
+        **{name: out[name][0] for name in FORECAST_COLUMNS},
+    })
+
+def dcf_valuation(fcff_forecast: pd.DataFrame, wacc, exit_multiple: float) -> dict:
+    # wacc may be a constant or a per-year sequence of discount rates (term structure)
+    forecast = {
+        "FCFF": fcff_forecast["FCFF"].to_numpy(dtype=float)[None, :],
+        "EBITDA": fcff_forecast["EBITDA"].to_numpy(dtype=float)[None, :],
+    }
+    wacc = np.asarray(wacc, dtype=float)[None, :] if np.ndim(wacc) == 1 else wacc
+    out = dcf_valuation_batch(forecast, wacc=wacc, exit_multiple=exit_multiple)
+
+    return {name: float(out[name][0]) for name in ("PV_FCFF", "Terminal_Value", "PV_Terminal", "Enterprise_Value")}
+
+# Vectorized engine: every assumption may be
+#   - a scalar (same for all scenarios and years),
+#   - a 1-D array of scenarios (n,), constant across years,
+#   - a 2-D (n x years) or (1 x years) curve, varying by year.
+# Outputs are (scenario x year) arrays with the same names as forecast_fcff columns.
+FORECAST_COLUMNS = ("Revenue", "EBITDA", "D&A", "EBIT", "Taxes", "NOPAT", "CapEx", "NWC", "ΔNWC", "FCFF")
+
+def _scenario_year_arrays(years: int, *inputs) -> list:
+    arrays = []
+    for x in inputs:
+        x = np.asarray(x, dtype=float)
+        if x.ndim > 2:
+            raise ValueError("Assumptions must be scalars, (scenarios,) or (scenarios, years) arrays.")
+        if x.ndim == 2 and x.shape[1] != years:
+            raise ValueError(f"Per-year assumption curves need {years} columns, got {x.shape[1]}.")
+        arrays.append(x[:, None] if x.ndim == 1 else x)
+
+    shape = np.broadcast_shapes(*(a.shape[:1] for a in arrays))
+    n_scen = shape[0] if shape else 1
+    return [np.broadcast_to(a, (n_scen, years)) for a in arrays]
+
+def forecast_fcff_batch(
+    revenue0,
+    years: int,
+    revenue_growth,
+    ebitda_margin,
+    da_pct_revenue,
+    capex_pct_revenue,
+    nwc_pct_revenue,
+    tax_rate,
+) -> dict:
+    years = int(years)
+    revenue0, revenue_growth, ebitda_margin, da_pct_revenue, capex_pct_revenue, nwc_pct_revenue, tax_rate = (
+        _scenario_year_arrays(
+            years,
+            np.atleast_1d(np.asarray(revenue0, dtype=float)),
+            revenue_growth, ebitda_margin, da_pct_revenue,
+            capex_pct_revenue, nwc_pct_revenue, tax_rate,
+        )
+    )
+    revenue0 = revenue0[:, :1]
+
     year = np.arange(1, years + 1)
-    revenue = revenue0 * (1 + revenue_growth) ** year
+    revenue = revenue0 * np.cumprod(1 + revenue_growth, axis=1)
     ebitda = revenue * ebitda_margin
     da = revenue * da_pct_revenue
     ebit = ebitda - da
-    taxes = np.maximum(ebit,0) * tax_rate
+    taxes = np.maximum(ebit, 0) * tax_rate
     nopat = ebit - taxes
     capex = revenue * capex_pct_revenue
     nwc = revenue * nwc_pct_revenue
 
-    nwc0 = revenue0 * nwc_pct_revenue
-    delta_nwc = np.empty(years)
-    delta_nwc[0] = nwc[0] - nwc0
-    delta_nwc[1:] = nwc[1:] - nwc[:-1]
+    nwc0 = revenue0 * nwc_pct_revenue[:, :1]
+    delta_nwc = np.diff(nwc, axis=1, prepend=nwc0)
 
     fcff = nopat + da - capex - delta_nwc
 
-    return pd.DataFrame({
+    return {
         "Year": year,
         "Revenue": revenue,
         "EBITDA": ebitda,
@@ -43,27 +115,225 @@ def forecast_fcff(
         "NWC": nwc,
         "ΔNWC": delta_nwc,
         "FCFF": fcff,
-    })
+    }
+
+# wacc is a scalar, (n,) per scenario, or a (n | 1, years) curve of year-by-year discount rates
+def dcf_valuation_batch(forecast: dict, wacc, exit_multiple) -> dict:
+    fcff = np.atleast_2d(forecast["FCFF"])
+    ebitda_exit = np.atleast_2d(forecast["EBITDA"])[:, -1]
+    n_years = fcff.shape[1]
 
-def dcf_valuation(fcff_forecast: pd.DataFrame, wacc: float, exit_multiple: float) -> dict:
-    fcff = fcff_forecast["FCFF"].values
-    ebitda_exit = float(fcff_forecast["EBITDA"].iloc[-1])
+    wacc = np.asarray(wacc, dtype=float)
+    exit_multiple = np.asarray(exit_multiple, dtype=float)
 
-    t = np.arange(1, len(fcff) + 1)
-    discount_factors = 1 / (1 + wacc) ** t
+    rates = _scenario_year_arrays(n_years, wacc)[0]
+    discount_factors = np.cumprod(1 / (1 + rates), axis=1)
 
-    pv_fcff = float((fcff * discount_factors).sum())
+    pv_fcff = (fcff * discount_factors).sum(axis=-1)
     terminal_value = ebitda_exit * exit_multiple
-    pv_terminal = float(terminal_value / (1 + wacc) ** len(fcff))
+    pv_terminal = terminal_value * discount_factors[:, -1]
     enterprise_value = pv_fcff + pv_terminal
 
     return {
         "PV_FCFF": pv_fcff,
-        "Terminal_Value": float(terminal_value),
+        "Terminal_Value": terminal_value,
         "PV_Terminal": pv_terminal,
         "Enterprise_Value": enterprise_value,
     }
 
+# Enterprise_Value only, one year at a time: every input is a scalar or (n,) per scenario,
+# and only a handful of (n,) work arrays are alive at once instead of ~10 (n x years)
+# forecast columns. Same math as forecast_fcff_batch + dcf_valuation_batch.
+def enterprise_value_batch(
+    revenue0,
+    years: int,
+    revenue_growth,
+    ebitda_margin,
+    da_pct_revenue,
+    capex_pct_revenue,
+    nwc_pct_revenue,
+    tax_rate,
+    wacc,
+    exit_multiple,
+) -> np.ndarray:
+    inputs = [np.asarray(x, dtype=float) for x in (
+        revenue0, revenue_growth, ebitda_margin, da_pct_revenue, capex_pct_revenue,
+        nwc_pct_revenue, tax_rate, wacc, exit_multiple,
+    )]
+    if any(x.ndim > 1 for x in inputs):
+        raise ValueError("enterprise_value_batch takes scalars or (scenarios,) arrays; use dcf_valuation_batch for curves.")
+    if int(years) < 1:
+        raise ValueError("years must be at least 1.")
+    shape = np.broadcast_shapes(*(x.shape for x in inputs))
+    r0, g, m, d, c, n, tax, w, mult = inputs
+
+    revenue = np.broadcast_to(r0, shape).astype(float)
+    nwc_prev = revenue * n
+    discount = np.ones(shape)
+    ev = np.zeros(shape)
+    for _ in range(int(years)):
+        revenue *= 1 + g
+        discount /= 1 + w
+        ebitda = revenue * m
+        ebit = ebitda - revenue * d
+        nwc = revenue * n
+        # FCFF = EBIT - taxes + D&A - CapEx - ΔNWC
+        ev += (ebit - np.maximum(ebit, 0) * tax + revenue * (d - c) - (nwc - nwc_prev)) * discount
+        nwc_prev = nwc
+    ev += ebitda * mult * discount
+    return ev
+
+# Per-year assumption curves
+# Linear path from start (year 1) to end (final year); scalars give (1 x years), (n,) give (n x years)
+def fade_path(start, end, years: int) -> np.ndarray:
+    start = np.asarray(start, dtype=float)[..., None]
+    end = np.asarray(end, dtype=float)[..., None]
+    weight = np.linspace(0.0, 1.0, int(years)) if years > 1 else np.ones(1)
+    return np.atleast_2d(start + (end - start) * weight)
+
+# Exponential fade: the gap to `end` shrinks by half every `half_life` years
+def decay_path(start, end, years: int, half_life: float = 2.0) -> np.ndarray:
+    start = np.asarray(start, dtype=float)[..., None]
+    end = np.asarray(end, dtype=float)[..., None]
+    t = np.arange(int(years))
+    return np.atleast_2d(end + (start - end) * 0.5 ** (t / float(half_life)))
+
+# Year-by-year discount rates from a spot yield curve plus a spread.
+# Spot yields z(t) (interpolated by maturity) are turned into one-year forward
+# rates, so cumprod(1 / (1 + r_t)) equals 1 / (1 + z(t) + spread)^t.
+# A scalar spread gives a (1 x years) curve, (n,) spreads give (n x years).
+def term_structure_rates(maturities, yields, years: int, spread=0.0) -> np.ndarray:
+    maturities = np.asarray(maturities, dtype=float)
+    order = np.argsort(maturities)
+    t = np.arange(1, int(years) + 1)
+    spot = np.interp(t, maturities[order], np.asarray(yields, dtype=float)[order])
+    spot = spot + np.asarray(spread, dtype=float)[..., None]
+
+    growth = (1 + spot) ** t
+    prev = np.concatenate([np.ones_like(growth[..., :1]), growth[..., :-1]], axis=-1)
+    return np.atleast_2d(growth / prev - 1)
+
+# Exact partial derivatives of Enterprise_Value, computed in the same pass as the valuation.
+# Every rate may be a per-year curve (x_t); a curve's derivative is for a parallel shift of all years.
+# FCFF_t = R_t * k_t + n_{t-1} * R_{t-1}, with k_t = (m_t - d_t)(1 - tax_t * 1[EBIT_t > 0]) + d_t - c_t - n_t
+# (n_0 = n_1), EV = sum_t D_t * FCFF_t + M * m_N * R_N * D_N,
+# R_t = revenue0 * G_t, G_t = prod_{s<=t} (1 + g_s), D_t = prod_{s<=t} 1 / (1 + wacc_s).
+# Parallel shifts: dR_t/dg = R_t * H_t, H_t = sum_{s<=t} 1 / (1 + g_s); dD_t/dwacc = -D_t * Q_t,
+# Q_t = sum_{s<=t} 1 / (1 + wacc_s). With constant rates H_t = t / (1 + g) and Q_t = t / (1 + wacc).
+# (At EBIT_t = 0 the tax kink uses the one-sided derivative from the loss side.)
+SENSITIVITY_INPUTS = (
+    "revenue0",
+    "revenue_growth",
+    "ebitda_margin",
+    "da_pct_revenue",
+    "capex_pct_revenue",
+    "nwc_pct_revenue",
+    "tax_rate",
+    "wacc",
+    "exit_multiple",
+)
+
+def dcf_sensitivities_batch(
+    revenue0,
+    years: int,
+    revenue_growth,
+    ebitda_margin,
+    da_pct_revenue,
+    capex_pct_revenue,
+    nwc_pct_revenue,
+    tax_rate,
+    wacc,
+    exit_multiple,
+) -> dict:
+    years = int(years)
+    # Scenario count from every input (wacc / exit_multiple included), forecast broadcast to match
+    r0, g, m, d, c, n, tax, w, mult = _scenario_year_arrays(
+        years,
+        np.atleast_1d(np.asarray(revenue0, dtype=float)),
+        revenue_growth, ebitda_margin, da_pct_revenue, capex_pct_revenue,
+        nwc_pct_revenue, tax_rate, wacc,
+        np.atleast_1d(np.asarray(exit_multiple, dtype=float)),
+    )
+    r0 = r0[:, :1]
+    mult = mult[:, 0]
+
+    forecast = forecast_fcff_batch(
+        revenue0=r0[:, 0],
+        years=years,
+        revenue_growth=g,
+        ebitda_margin=m,
+        da_pct_revenue=d,
+        capex_pct_revenue=c,
+        nwc_pct_revenue=n,
+        tax_rate=tax,
+    )
+    val = dcf_valuation_batch(forecast, wacc=w, exit_multiple=mult)
+
+    revenue = forecast["Revenue"]
+    revenue_prev = np.concatenate([r0, revenue[:, :-1]], axis=1)
+    n_prev = np.concatenate([n[:, :1], n[:, :-1]], axis=1)
+    fcff = forecast["FCFF"]
+    taxed = (forecast["EBIT"] > 0).astype(float)
+
+    disc = np.cumprod(1 / (1 + w), axis=1)
+    disc_n = disc[:, -1]
+    rev_n = revenue[:, -1]
+    k = (m - d) * (1 - tax * taxed) + d - c - n
+
+    growth_factor = np.cumprod(1 + g, axis=1)
+    growth_factor_prev = np.concatenate([np.ones_like(r0), growth_factor[:, :-1]], axis=1)
+    growth_slope = np.cumsum(1 / (1 + g), axis=1)
+    growth_slope_prev = np.concatenate([np.zeros_like(r0), growth_slope[:, :-1]], axis=1)
+    discount_slope = np.cumsum(1 / (1 + w), axis=1)
+
+    grads = {
+        "revenue0": (disc * (growth_factor * k + n_prev * growth_factor_prev)).sum(axis=1)
+                    + mult * m[:, -1] * growth_factor[:, -1] * disc_n,
+        "revenue_growth": (disc * (k * growth_slope * revenue + n_prev * growth_slope_prev * revenue_prev)).sum(axis=1)
+                          + mult * m[:, -1] * growth_slope[:, -1] * rev_n * disc_n,
+        "ebitda_margin": (disc * revenue * (1 - tax * taxed)).sum(axis=1) + mult * rev_n * disc_n,
+        "da_pct_revenue": (disc * revenue * tax * taxed).sum(axis=1),
+        "capex_pct_revenue": -(disc * revenue).sum(axis=1),
+        "nwc_pct_revenue": (disc * (revenue_prev - revenue)).sum(axis=1),
+        "tax_rate": -(disc * revenue * (m - d) * taxed).sum(axis=1),
+        "wacc": -((discount_slope * disc * fcff).sum(axis=1) + discount_slope[:, -1] * val["PV_Terminal"]),
+        "exit_multiple": forecast["EBITDA"][:, -1] * disc_n,
+    }
+
+    val["Sensitivities"] = grads
+    return val
+
+# Single-scenario convenience: dEV/dx per assumption as a Series
+# As in forecast_fcff, a 1-D rate is a per-year curve (shifted in parallel for its derivative).
+def dcf_sensitivities(**assumptions) -> pd.Series:
+    return dcf_valuation_with_sensitivities(**assumptions)[1]
+
+# Valuation dict (as dcf_valuation) and dEV/dx Series from the same single pass
+def dcf_valuation_with_sensitivities(**assumptions) -> tuple:
+    per_year = lambda x: np.asarray(x, dtype=float)[None, :] if np.ndim(x) == 1 else x
+    assumptions = {
+        name: per_year(value) if name not in ("revenue0", "years", "exit_multiple") else value
+        for name, value in assumptions.items()
+    }
+    out = dcf_sensitivities_batch(**assumptions)
+    val = {name: float(out[name][0]) for name in ("PV_FCFF", "Terminal_Value", "PV_Terminal", "Enterprise_Value")}
+    sens = pd.Series({name: float(out["Sensitivities"][name][0]) for name in SENSITIVITY_INPUTS}, name="dEV/dx")
+    return val, sens
+
+# Tornado data: first-order EV change for a +/- relative shock to each assumption
+def tornado_frame(sensitivities: pd.Series, assumptions: dict, shock: float = 0.10) -> pd.DataFrame:
+    base = pd.Series({name: float(assumptions[name]) for name in sensitivities.index})
+    impact = sensitivities * base * shock
+    out = pd.DataFrame({
+        "Assumption": sensitivities.index,
+        "Base": base.values,
+        "dEV/dx": sensitivities.values,
+        "EV_Down": -impact.values,
+        "EV_Up": impact.values,
+    })
+    out["Swing"] = (out["EV_Up"] - out["EV_Down"]).abs()
+    return out.sort_values("Swing", ascending=False).reset_index(drop=True)
+
 def compute_wacc(
         market_cap, 
         total_debt,
@@ -0,0 +1,176 @@
+import yfinance as yf
+import pandas as pd
+import numpy as np
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Peer multiples index (EV/EBITDA, EV/Revenue) grouped by sector / industry
+# Multiples are fetched once, then stored as one sorted array per (group, metric),
+# so median / percentile queries are index arithmetic and value-range subsets
+# (e.g. trimming outliers) cost two binary searches: O(log n) per query.
+
+PEER_METRICS = ("ev_ebitda", "ev_revenue")
+PEER_GROUP_LEVELS = ("industry", "sector")
+MIN_PEERS = 5  # Fall back from industry to sector to all names below this
+PEER_CACHE_TTL_SECONDS = 60 * 60 * 24  # 1 day
+PEER_CACHE_MAX_ENTRIES = 8  # Distinct universes kept, least recently used dropped first
+PEER_FETCH_THREADS = int(os.getenv("PEER_FETCH_THREADS", 16))  # Concurrent yfinance info calls
+
+DEFAULT_PEER_UNIVERSE = (
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "ORCL", "CRM", "ADBE", "CSCO",
+    "INTC", "AMD", "IBM", "QCOM", "TXN", "AVGO", "JPM", "BAC", "WFC", "C",
+    "GS", "MS", "JNJ", "PFE", "MRK", "ABBV", "LLY", "UNH", "XOM", "CVX",
+    "COP", "PG", "KO", "PEP", "WMT", "COST", "HD", "MCD", "NKE", "DIS",
+)
+
+
+# One ticker's multiples from yfinance info (network), None if unavailable
+def _fetch_peer_row(ticker: str) -> dict | None:
+    try:
+        info = yf.Ticker(ticker).info or {}
+    except Exception as e:
+        print({"Warning": f"Could not fetch peer info for {ticker}: {e}"})
+        return None
+
+    ev = info.get("enterpriseValue")
+    ebitda = info.get("ebitda")
+    revenue = info.get("totalRevenue")
+
+    ev_ebitda = info.get("enterpriseToEbitda")
+    if ev_ebitda is None and ev and ebitda:
+        ev_ebitda = ev / ebitda
+    ev_revenue = info.get("enterpriseToRevenue")
+    if ev_revenue is None and ev and revenue:
+        ev_revenue = ev / revenue
+
+    return {
+        "ticker": ticker.upper(),
+        "sector": info.get("sector") or "Unknown",
+        "industry": info.get("industry") or "Unknown",
+        "ev_ebitda": ev_ebitda,
+        "ev_revenue": ev_revenue,
+    }
+
+
+# Fetch multiples for the whole universe, calls are I/O bound so they run concurrently
+def fetch_peer_multiples(tickers, max_workers: int = PEER_FETCH_THREADS) -> pd.DataFrame:
+    tickers = list(tickers)
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(tickers)), 1), thread_name_prefix="peer-fetch") as pool:
+        rows = [row for row in pool.map(_fetch_peer_row, tickers) if row is not None]
+    return pd.DataFrame(rows, columns=["ticker", "sector", "industry", *PEER_METRICS])
+
+
+class PeerMultiplesIndex:
+    def __init__(self, multiples: pd.DataFrame):
+        self.multiples = multiples.reset_index(drop=True)
+        self._sorted = {}  # (level, group, metric) -> sorted float array
+
+        for metric in PEER_METRICS:
+            values = pd.to_numeric(self.multiples[metric], errors="coerce")
+            # Negative / missing multiples are not meaningful peers
+            ok = values.notna() & (values > 0)
+            self._sorted[("all", "all", metric)] = np.sort(values[ok].to_numpy(dtype=float))
+
+            for level in PEER_GROUP_LEVELS:
+                frame = pd.DataFrame({"group": self.multiples.loc[ok, level], "value": values[ok]})
+                frame = frame.sort_values(["group", "value"], kind="stable")
+                for group, vals in frame.groupby("group", sort=False)["value"]:
+                    self._sorted[(level, group, metric)] = vals.to_numpy(dtype=float)
+
+    @classmethod
+    def from_tickers(cls, tickers) -> "PeerMultiplesIndex":
+        return cls(fetch_peer_multiples(tickers))
+
+    def groups(self, level: str) -> list:
+        return sorted({g for (lvl, g, _) in self._sorted if lvl == level})
+
+    def _array(self, metric: str, level: str = "all", group: str = "all") -> np.ndarray:
+        if metric not in PEER_METRICS:
+            raise ValueError(f"Unknown peer metric {metric!r}. Choose from {PEER_METRICS}.")
+        return self._sorted.get((level, group, metric), np.empty(0))
+
+    # Peer subset: group plus an optional [lo, hi] value band, as a slice of the sorted array
+    def _subset(self, metric, level="all", group="all", lo=None, hi=None) -> np.ndarray:
+        arr = self._array(metric, level, group)
+        start = 0 if lo is None else int(np.searchsorted(arr, lo, side="left"))
+        stop = len(arr) if hi is None else int(np.searchsorted(arr, hi, side="right"))
+        return arr[start:stop]
+
+    def count(self, metric, level="all", group="all", lo=None, hi=None) -> int:
+        return len(self._subset(metric, level, group, lo, hi))
+
+    # Linear-interpolated percentile (same convention as np.percentile), q in [0, 100]
+    def percentile(self, metric, q, level="all", group="all", lo=None, hi=None) -> float:
+        arr = self._subset(metric, level, group, lo, hi)
+        if len(arr) == 0:
+            return float("nan")
+        pos = (len(arr) - 1) * min(max(float(q), 0.0), 100.0) / 100.0
+        below = int(np.floor(pos))
+        above = min(below + 1, len(arr) - 1)
+        return float(arr[below] + (arr[above] - arr[below]) * (pos - below))
+
+    def median(self, metric, level="all", group="all", lo=None, hi=None) -> float:
+        return self.percentile(metric, 50, level, group, lo, hi)
+
+    # Where a value ranks among peers, 0-100
+    def rank(self, metric, value, level="all", group="all") -> float:
+        arr = self._array(metric, level, group)
+        if len(arr) == 0:
+            return float("nan")
+        return 100.0 * np.searchsorted(arr, value, side="right") / len(arr)
+
+    # Industry peers if there are enough, else sector, else the whole universe
+    def peer_group(self, sector=None, industry=None, metric: str = "ev_ebitda", min_peers: int = MIN_PEERS) -> tuple:
+        for level, group in (("industry", industry), ("sector", sector)):
+            if group and len(self._array(metric, level, group)) >= min_peers:
+                return level, group
+        return "all", "all"
+
+    def summary(self, metric, level="all", group="all", lo=None, hi=None) -> dict:
+        return {
+            "level": level,
+            "group": group,
+            "count": self.count(metric, level, group, lo, hi),
+            "p25": self.percentile(metric, 25, level, group, lo, hi),
+            "median": self.median(metric, level, group, lo, hi),
+            "p75": self.percentile(metric, 75, level, group, lo, hi),
+        }
+
+
+# Process-wide LRU cache of built indexes, keyed by universe (shared by all sessions)
+_PEER_INDEX_CACHE = OrderedDict()
+_PEER_INDEX_LOCK = threading.Lock()
+
+def get_peer_index(tickers=DEFAULT_PEER_UNIVERSE, cache_ttl_seconds: int = PEER_CACHE_TTL_SECONDS) -> PeerMultiplesIndex:
+    key = tuple(sorted({t.strip().upper() for t in tickers if t and t.strip()}))
+    now = time.time()
+    with _PEER_INDEX_LOCK:
+        cached = _PEER_INDEX_CACHE.get(key)
+        if cached is not None and (now - cached["ts"]) < cache_ttl_seconds:
+            _PEER_INDEX_CACHE.move_to_end(key)
+            return cached["index"]
+
+    # Build outside the lock so other universes aren't blocked by the network
+    index = PeerMultiplesIndex.from_tickers(key)
+    with _PEER_INDEX_LOCK:
+        _PEER_INDEX_CACHE[key] = {"ts": now, "index": index}
+        _PEER_INDEX_CACHE.move_to_end(key)
+        while len(_PEER_INDEX_CACHE) > PEER_CACHE_MAX_ENTRIES:
+            _PEER_INDEX_CACHE.popitem(last=False)
+    return index
+
+
+# Suggested exit multiple (median EV/EBITDA of the closest peer group)
+def seed_exit_multiple(index: PeerMultiplesIndex, sector=None, industry=None) -> dict:
+    level, group = index.peer_group(sector=sector, industry=industry)
+    out = index.summary("ev_ebitda", level, group)
+    out["exit_multiple"] = out["median"]
+    return out
+
+
+if __name__ == "__main__":
+    idx = get_peer_index()
+    print(seed_exit_multiple(idx, sector="Technology", industry="Consumer Electronics"))
@@ -0,0 +1,309 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import sqlite3
+import atexit
+import hashlib
+import threading
+
+from model import MODEL_VERSION, forecast_fcff, dcf_valuation, compute_wacc
+
+# Persistent content-addressed store for valuation results
+# Key = sha256 of (function, full assumption set, MODEL_VERSION), so any user,
+# worker process or batch job computing an identical scenario reads it from disk.
+# SQLite in WAL mode handles concurrent readers/writers across processes.
+
+RESULT_STORE_PATH = os.getenv(
+    "RESULT_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "valuation_results.sqlite"),
+)
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", 256 * 1024 * 1024))  # 256 MB
+RESULT_STORE_PRUNE_EVERY = 100  # Check size after this many writes
+RESULT_STORE_FLUSH_EVERY = 100  # Write buffered hit / access stats after this many lookups
+RESULT_STORE_FORMAT = "json-1"  # Payload encoding, part of every key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    fn TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+# Canonical, order-independent form of the inputs for hashing
+# Floats are tagged so 0.1 and the string "0.1" never share a key.
+def _canonical(value):
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.sha256()
+        digest.update(json.dumps([str(c) for c in value.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        return {"__frame__": digest.hexdigest()}
+    if isinstance(value, StoredKey):
+        return {"__result__": str(value)}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return [_canonical(v) for v in value.tolist()]
+    if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return {"__float__": repr(float(value))}
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+
+# Key of a stored result, usable as an input in place of the result itself
+class StoredKey(str):
+    pass
+
+
+def result_key(fn_name: str, inputs: dict, model_version: str = MODEL_VERSION) -> str:
+    blob = json.dumps(
+        {"fn": fn_name, "inputs": _canonical(inputs), "model_version": model_version, "format": RESULT_STORE_FORMAT},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# Payloads are JSON: frames as column lists (floats round-trip exactly via repr), dicts as-is
+def _encode(value):
+    if isinstance(value, pd.DataFrame):
+        return {"__frame__": {
+            "columns": [str(c) for c in value.columns],
+            "dtypes": [str(t) for t in value.dtypes],
+            "data": [value[c].tolist() for c in value.columns],
+            "index": None if isinstance(value.index, pd.RangeIndex) and value.index.start == 0 and value.index.step == 1
+            else value.index.tolist(),
+            "index_name": value.index.name,
+        }}
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        frame = value.get("__frame__")
+        if isinstance(frame, dict) and len(value) == 1:
+            df = pd.DataFrame(dict(zip(frame["columns"], frame["data"])), columns=frame["columns"])
+            df = df.astype(dict(zip(frame["columns"], frame["dtypes"])))
+            if frame["index"] is not None:
+                df.index = pd.Index(frame["index"])
+            df.index.name = frame["index_name"]
+            return df
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def dumps_payload(value) -> bytes:
+    return json.dumps(_encode(value), separators=(",", ":")).encode()
+
+
+def loads_payload(payload: bytes):
+    return _decode(json.loads(payload))
+
+
+class ResultStore:
+    def __init__(self, path: str = RESULT_STORE_PATH, max_bytes: int = RESULT_STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self._local = threading.local()
+        self._writes = 0
+        # Hit counters and last_access updates are buffered and flushed in one transaction
+        self._stats_lock = threading.Lock()
+        self._pending_access = {}  # key -> [last_access, hits]
+        self._pending_counters = {}  # name -> increment
+        self._lookups = 0
+
+    # One connection per thread (and per process after fork)
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            # Directory is created on first use, so importing works on a read-only tree
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _record(self, counter: str, key: str | None = None):
+        with self._stats_lock:
+            self._pending_counters[counter] = self._pending_counters.get(counter, 0) + 1
+            if key is not None:
+                access = self._pending_access.setdefault(key, [0.0, 0])
+                access[0] = time.time()
+                access[1] += 1
+            self._lookups += 1
+            due = self._lookups % RESULT_STORE_FLUSH_EVERY == 0
+        if due:
+            self.flush()
+
+    # Write buffered counters / access times (also done before prune and stats)
+    def flush(self):
+        with self._stats_lock:
+            access, self._pending_access = self._pending_access, {}
+            counters, self._pending_counters = self._pending_counters, {}
+        if not access and not counters:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE results SET last_access = MAX(last_access, ?), hit_count = hit_count + ? WHERE key = ?",
+                [(ts, hits, key) for key, (ts, hits) in access.items()],
+            )
+            conn.executemany(
+                "INSERT INTO counters(name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(counters.items()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str):
+        row = self._conn().execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._record("misses")
+            return None
+        self._record("hits", key)
+        return loads_payload(row[0])
+
+    def put(self, key: str, value, fn_name: str = "", model_version: str = MODEL_VERSION):
+        payload = dumps_payload(value)
+        now = time.time()
+        conn = self._conn()
+        # Same key always means the same result, so a racing writer can be ignored
+        conn.execute(
+            "INSERT OR IGNORE INTO results(key, fn, model_version, payload, nbytes, created, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, fn_name, model_version, payload, len(payload), now, now),
+        )
+        self._writes += 1
+        if self._writes % RESULT_STORE_PRUNE_EVERY == 0:
+            self.prune()
+
+    # Returns (value, key); key_inputs replaces inputs for hashing (e.g. a StoredKey for a frame)
+    def cached_call_keyed(self, fn, fn_name: str | None = None, key_inputs: dict | None = None, **inputs):
+        fn_name = fn_name or fn.__name__
+        key = StoredKey(result_key(fn_name, inputs if key_inputs is None else key_inputs))
+        value = self.get(key)
+        if value is None:
+            value = fn(**inputs)
+            self.put(key, value, fn_name=fn_name)
+        return value, key
+
+    def cached_call(self, fn, fn_name: str | None = None, key_inputs: dict | None = None, **inputs):
+        return self.cached_call_keyed(fn, fn_name=fn_name, key_inputs=key_inputs, **inputs)[0]
+
+    # Drop least recently used results until the store is back under 90% of budget
+    def prune(self, max_bytes: int | None = None) -> int:
+        budget = self.max_bytes if max_bytes is None else int(max_bytes)
+        self.flush()
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        if total <= budget:
+            return 0
+
+        target = int(budget * 0.9)
+        removed = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT key, nbytes FROM results ORDER BY last_access ASC").fetchall()
+            doomed = []
+            for key, nbytes in rows:
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= nbytes
+            conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+            removed = len(doomed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    # Drop results computed by older model versions
+    def purge_stale_versions(self, model_version: str = MODEL_VERSION) -> int:
+        cur = self._conn().execute("DELETE FROM results WHERE model_version != ?", (model_version,))
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        self.flush()
+        conn = self._conn()
+        entries, nbytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        by_fn = dict(conn.execute("SELECT fn, COUNT(*) FROM results GROUP BY fn").fetchall())
+        return {
+            "entries": entries,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if (hits + misses) else 0.0,
+            "entries_by_fn": by_fn,
+        }
+
+
+RESULT_STORE = ResultStore()
+atexit.register(RESULT_STORE.flush)
+
+
+# Drop-in cached versions of the model functions
+def stored_forecast_fcff(store: ResultStore = RESULT_STORE, **inputs) -> pd.DataFrame:
+    return store.cached_call(forecast_fcff, **inputs)
+
+
+# Same, plus the result key to pass on as stored_dcf_valuation(forecast_key=...)
+def stored_forecast_fcff_keyed(store: ResultStore = RESULT_STORE, **inputs) -> tuple:
+    return store.cached_call_keyed(forecast_fcff, **inputs)
+
+
+# With forecast_key the forecast is identified by its stored key instead of hashing the frame
+def stored_dcf_valuation(fcff_forecast: pd.DataFrame, wacc: float, exit_multiple: float,
+                         store: ResultStore = RESULT_STORE, forecast_key: str | None = None) -> dict:
+    key_inputs = None
+    if forecast_key is not None:
+        key_inputs = {"fcff_forecast": StoredKey(forecast_key), "wacc": wacc, "exit_multiple": exit_multiple}
+    return store.cached_call(
+        dcf_valuation, key_inputs=key_inputs,
+        fcff_forecast=fcff_forecast, wacc=wacc, exit_multiple=exit_multiple,
+    )
+
+
+def stored_compute_wacc(store: ResultStore = RESULT_STORE, **inputs) -> dict:
+    return store.cached_call(compute_wacc, **inputs)
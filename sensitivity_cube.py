@@ -0,0 +1,264 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+
+from model import enterprise_value_batch
+
+# Out-of-core N-dimensional sensitivity cubes
+# The cube (one axis per swept assumption, Enterprise_Value per cell) is evaluated
+# in flat blocks with the batched model and written straight into a memory-mapped
+# .npy file. Reductions walk the file block by block, so e.g. 40^5 = 100M cells
+# never have to fit in RAM at once. Block sizes come from a byte budget.
+
+CUBE_BLOCK_BYTES = int(os.getenv("CUBE_BLOCK_BYTES", 64 * 1024 * 1024))  # Working memory per block
+CUBE_WORK_ARRAYS = 12  # Live float64 arrays per cell in enterprise_value_batch (inputs + year-loop temporaries)
+CUBE_REDUCE_ARRAYS = 3  # float64 block copy + reduction temporaries in SensitivityCube reductions
+
+FORECAST_AXES = (
+    "revenue0",
+    "revenue_growth",
+    "ebitda_margin",
+    "da_pct_revenue",
+    "capex_pct_revenue",
+    "nwc_pct_revenue",
+    "tax_rate",
+)
+VALUATION_AXES = ("wacc", "exit_multiple")
+CUBE_AXES = FORECAST_AXES + VALUATION_AXES
+
+
+def _axes_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".axes.json"
+
+
+# Cells per block so that (arrays per cell x 8 bytes) x cells stays within the byte budget.
+# The EV-only model loops over years, so the per-cell cost does not grow with the horizon.
+def block_cells_for(bytes_per_cell: int, block_bytes: int = CUBE_BLOCK_BYTES) -> int:
+    return max(int(block_bytes) // max(int(bytes_per_cell), 1), 1)
+
+
+def build_cube(
+        path: str,
+        axes: dict,
+        base: dict,
+        years: int | None = None,
+        dtype: str = "float32",
+        block_cells: int | None = None,
+) -> "SensitivityCube":
+    unknown = set(axes) - set(CUBE_AXES)
+    if unknown:
+        raise ValueError(f"Unsupported cube axes {sorted(unknown)}. Choose from {CUBE_AXES}.")
+    if not axes:
+        raise ValueError("At least one axis is required.")
+
+    names = list(axes)
+    values = [np.asarray(axes[n], dtype=float).ravel() for n in names]
+    shape = tuple(len(v) for v in values)
+    years = int(years if years is not None else base.get("years", 5))
+
+    if block_cells is None:
+        # Per cell: the model's work arrays plus one int64 index per swept axis
+        block_cells = block_cells_for(8 * (CUBE_WORK_ARRAYS + len(names)))
+
+    cube = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    flat = cube.reshape(-1)
+    total = flat.size
+
+    for start in range(0, total, block_cells):
+        stop = min(start + block_cells, total)
+        # Flat cell ids -> per-axis indices -> assumption arrays for this block
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        inputs = {name: float(base[name]) for name in CUBE_AXES if name in base}
+        for name, vals, ix in zip(names, values, idx):
+            inputs[name] = vals[ix]
+
+        ev = enterprise_value_batch(years=years, **{name: inputs[name] for name in CUBE_AXES})
+        flat[start:stop] = np.broadcast_to(ev, (stop - start,))
+        del idx, inputs, ev
+
+    cube.flush()
+    del cube
+
+    with open(_axes_path(path), "w", encoding="utf-8") as f:
+        json.dump({
+            "axes": {n: v.tolist() for n, v in zip(names, values)},
+            "base": {k: float(v) for k, v in base.items() if isinstance(v, (int, float))},
+            "years": years,
+            "value": "Enterprise_Value",
+        }, f)
+
+    return open_cube(path)
+
+
+def open_cube(path: str) -> "SensitivityCube":
+    with open(_axes_path(path), encoding="utf-8") as f:
+        meta = json.load(f)
+    data = np.load(path, mmap_mode="r")
+    return SensitivityCube(data, meta)
+
+
+class SensitivityCube:
+    def __init__(self, data: np.ndarray, meta: dict):
+        self.data = data
+        self.meta = meta
+        self.names = list(meta["axes"])
+        self.axes = {n: np.asarray(v) for n, v in meta["axes"].items()}
+
+    @property
+    def shape(self) -> tuple:
+        return self.data.shape
+
+    def _axis(self, name: str) -> int:
+        if name not in self.names:
+            raise KeyError(f"Cube has no axis {name!r}. Axes: {self.names}")
+        return self.names.index(name)
+
+    # Nearest grid index for a requested assumption value
+    def index_of(self, name: str, value: float) -> int:
+        return int(np.argmin(np.abs(self.axes[name] - float(value))))
+
+    # Fix some axes at (nearest) values; 2-D results come back as labelled DataFrames
+    def sel(self, **fixed):
+        key = []
+        for name in self.names:
+            key.append(self.index_of(name, fixed[name]) if name in fixed else slice(None))
+        out = np.asarray(self.data[tuple(key)])
+
+        free = [n for n in self.names if n not in fixed]
+        if len(free) == 2:
+            return pd.DataFrame(
+                out,
+                index=pd.Index(self.axes[free[0]], name=free[0]),
+                columns=pd.Index(self.axes[free[1]], name=free[1]),
+            )
+        if len(free) == 1:
+            return pd.Series(out, index=pd.Index(self.axes[free[0]], name=free[0]), name="Enterprise_Value")
+        return out
+
+    # Leading-axis blocks sized to roughly block_cells
+    def _blocks(self, block_cells: int | None = None):
+        if block_cells is None:
+            block_cells = block_cells_for(8 * CUBE_REDUCE_ARRAYS)
+        per_row = int(np.prod(self.shape[1:], dtype=np.int64)) or 1
+        rows = max(block_cells // per_row, 1)
+        for start in range(0, self.shape[0], rows):
+            stop = min(start + rows, self.shape[0])
+            yield start, stop, np.asarray(self.data[start:stop], dtype=np.float64)
+
+    # Reduce over every axis not in keep ("mean", "min", "max", "sum")
+    def marginal(self, keep=(), stat: str = "mean", block_cells: int | None = None):
+        if stat not in ("mean", "min", "max", "sum"):
+            raise ValueError("stat must be one of 'mean', 'min', 'max', 'sum'.")
+        keep = [keep] if isinstance(keep, str) else list(keep)
+        keep_ix = sorted(self._axis(n) for n in keep)
+        reduce_inner = tuple(i for i in range(1, len(self.shape)) if i not in keep_ix)
+        lead_kept = 0 in keep_ix
+
+        reducer = {"mean": np.sum, "sum": np.sum, "min": np.min, "max": np.max}[stat]
+        parts = []
+        acc = None
+        for _, _, block in self._blocks(block_cells):
+            red = reducer(block, axis=reduce_inner) if reduce_inner else block
+            if lead_kept:
+                parts.append(red)
+                continue
+            red = reducer(red, axis=0)
+            if acc is None:
+                acc = red
+            elif stat in ("mean", "sum"):
+                acc = acc + red
+            elif stat == "min":
+                acc = np.minimum(acc, red)
+            else:
+                acc = np.maximum(acc, red)
+
+        out = np.concatenate(parts, axis=0) if lead_kept else acc
+        if stat == "mean":
+            kept_cells = int(np.prod([self.shape[i] for i in keep_ix], dtype=np.int64)) if keep_ix else 1
+            out = out / (self.data.size / kept_cells)
+
+        kept_names = [self.names[i] for i in keep_ix]
+        if len(kept_names) == 1:
+            return pd.Series(out, index=pd.Index(self.axes[kept_names[0]], name=kept_names[0]), name=stat)
+        if len(kept_names) == 2:
+            return pd.DataFrame(
+                out,
+                index=pd.Index(self.axes[kept_names[0]], name=kept_names[0]),
+                columns=pd.Index(self.axes[kept_names[1]], name=kept_names[1]),
+            )
+        return out
+
+    # Percentiles over the whole cube (by=None) or for each value of one axis
+    # Global percentiles match np.percentile (linear) with bounded memory: a histogram pass
+    # finds the bins holding the needed order statistics, a second pass sorts only those bins.
+    def percentiles(self, q=(5, 25, 50, 75, 95), by: str | None = None, bins: int = 1 << 16, block_cells: int | None = None):
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+
+        if by is not None:
+            axis = self._axis(by)
+            rows = []
+            for i in range(self.shape[axis]):
+                slab = np.asarray(np.take(self.data, i, axis=axis), dtype=np.float64)
+                rows.append(np.nanpercentile(slab, q))
+            return pd.DataFrame(
+                rows,
+                index=pd.Index(self.axes[by], name=by),
+                columns=[f"p{int(x) if float(x).is_integer() else x}" for x in q],
+            )
+
+        lo = float(self.marginal(stat="min", block_cells=block_cells))
+        hi = float(self.marginal(stat="max", block_cells=block_cells))
+        if lo == hi:
+            return pd.Series(np.full(len(q), lo), index=q, name="Enterprise_Value")
+
+        scale = bins / (hi - lo)
+        bin_of = lambda v: np.clip(((v - lo) * scale).astype(np.int64), 0, bins - 1)
+
+        counts = np.zeros(bins, dtype=np.int64)
+        for _, _, block in self._blocks(block_cells):
+            counts += np.bincount(bin_of(block.ravel()), minlength=bins)
+        cum = np.cumsum(counts)
+        total = int(cum[-1])
+
+        # Order statistics k0 <= pos <= k1 for every q, and the bins they fall in
+        pos = (total - 1) * np.clip(q, 0.0, 100.0) / 100.0
+        ranks = np.unique(np.concatenate([np.floor(pos), np.ceil(pos)]).astype(np.int64))
+        rank_bins = np.searchsorted(cum, ranks, side="right")
+        needed = np.unique(rank_bins)
+
+        parts = []
+        for _, _, block in self._blocks(block_cells):
+            flat = block.ravel()
+            parts.append(flat[np.isin(bin_of(flat), needed)])
+        values = np.concatenate(parts)
+        values_bins = bin_of(values)
+
+        ordered = {}
+        for b in needed:
+            ordered[b] = np.sort(values[values_bins == b])
+        start = cum - counts
+        by_rank = {int(r): ordered[b][int(r - start[b])] for r, b in zip(ranks, rank_bins)}
+
+        below = np.floor(pos).astype(np.int64)
+        above = np.ceil(pos).astype(np.int64)
+        v_below = np.array([by_rank[int(k)] for k in below])
+        v_above = np.array([by_rank[int(k)] for k in above])
+        return pd.Series(v_below + (v_above - v_below) * (pos - below), index=q, name="Enterprise_Value")
+
+
+if __name__ == "__main__":
+    # Optional quick test (won't run when imported)
+    base = {
+        "revenue0": 5_000, "years": 5, "revenue_growth": 0.06, "ebitda_margin": 0.22,
+        "da_pct_revenue": 0.03, "capex_pct_revenue": 0.04, "nwc_pct_revenue": 0.10,
+        "tax_rate": 0.25, "wacc": 0.09, "exit_multiple": 8.0,
+    }
+    cube = build_cube("sensitivity_cube.npy", {
+        "wacc": np.linspace(0.06, 0.14, 20),
+        "exit_multiple": np.linspace(5, 14, 20),
+        "revenue_growth": np.linspace(0.0, 0.15, 20),
+    }, base)
+    print(cube.sel(revenue_growth=0.06))
+    print(cube.marginal("wacc"))
+    print(cube.percentiles())
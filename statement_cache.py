@@ -0,0 +1,162 @@
+import pandas as pd
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Process-wide cache for statement DataFrames shared by every Streamlit session
+# Sessions keep only the keys (ticker, period, statement) and resolve them here,
+# so 50 analysts on the same ticker share one copy of each statement.
+# Frames are treated as immutable: callers get shallow copies (copy-on-write in pandas >= 3).
+
+STATEMENT_CACHE_MAX_BYTES = int(os.getenv("STATEMENT_CACHE_MAX_BYTES", 512 * 1024 * 1024))  # 512 MB
+STATEMENT_REF_TTL_SECONDS = 60 * 60  # Session refs not refreshed within 1 hour are dropped
+STATEMENT_CACHE_TTL_SECONDS = int(os.getenv("STATEMENT_CACHE_TTL_SECONDS", 60 * 60 * 24))  # Refetch after 1 day
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class StatementCache:
+    def __init__(
+            self,
+            max_bytes: int = STATEMENT_CACHE_MAX_BYTES,
+            ref_ttl_seconds: float = STATEMENT_REF_TTL_SECONDS,
+            ttl_seconds: float = STATEMENT_CACHE_TTL_SECONDS,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.ref_ttl_seconds = ref_ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._frames: OrderedDict = OrderedDict()  # key -> DataFrame, oldest first
+        self._sizes: dict = {}
+        self._loaded: dict = {}  # key -> load timestamp, entries older than ttl_seconds are refetched
+        self._refs: dict = {}  # key -> {owner: last_seen_ts}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _touch_ref(self, key, owner):
+        if owner is not None:
+            self._refs.setdefault(key, {})[owner] = time.time()
+
+    def _drop(self, key):
+        self._frames.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+        self._loaded.pop(key, None)
+        self._refs.pop(key, None)
+
+    def _prune_stale_refs(self):
+        cutoff = time.time() - self.ref_ttl_seconds
+        for key in list(self._refs):
+            owners = {o: ts for o, ts in self._refs[key].items() if ts >= cutoff}
+            if owners:
+                self._refs[key] = owners
+            else:
+                del self._refs[key]
+
+    # LRU eviction, unreferenced entries go first
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        self._prune_stale_refs()
+        for only_unreferenced in (True, False):
+            for key in list(self._frames):
+                if self._bytes <= self.max_bytes:
+                    return
+                if only_unreferenced and self._refs.get(key):
+                    continue
+                self._drop(key)
+                self._evictions += 1
+
+    def get(self, key, owner=None) -> pd.DataFrame | None:
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None and time.time() - self._loaded[key] >= self.ttl_seconds:
+                # Expired: keep the session refs, the reload re-registers the frame
+                refs = self._refs.get(key)
+                self._drop(key)
+                if refs:
+                    self._refs[key] = refs
+                df = None
+            if df is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._frames.move_to_end(key)
+            self._touch_ref(key, owner)
+            return df.copy(deep=False)
+
+    def put(self, key, df: pd.DataFrame, owner=None):
+        size = frame_nbytes(df)
+        with self._lock:
+            if key in self._frames:
+                self._drop(key)
+            # Frames larger than the whole budget are served but never cached
+            if size > self.max_bytes:
+                return key
+            self._frames[key] = df
+            self._sizes[key] = size
+            self._loaded[key] = time.time()
+            self._bytes += size
+            self._touch_ref(key, owner)
+            self._evict()
+        return key
+
+    # refresh=True skips the cached frame and reloads it (e.g. after a new filing)
+    def get_or_load(self, key, loader, owner=None, refresh: bool = False) -> pd.DataFrame:
+        df = None if refresh else self.get(key, owner=owner)
+        if df is not None:
+            return df
+        # Load outside the lock so slow fetches don't block other sessions
+        df = loader()
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame()
+        self.put(key, df, owner=owner)
+        return df.copy(deep=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            refs = self._refs.get(key)
+            self._drop(key)
+            if refs:
+                self._refs[key] = refs
+
+    # Drop an owner's references, either for the given keys or all of them
+    def release(self, owner, keys=None):
+        with self._lock:
+            targets = list(self._refs) if keys is None else list(keys)
+            for key in targets:
+                owners = self._refs.get(key)
+                if owners and owner in owners:
+                    del owners[owner]
+                    if not owners:
+                        del self._refs[key]
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._sizes.clear()
+            self._loaded.clear()
+            self._refs.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._frames),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "referenced_entries": sum(1 for k in self._frames if self._refs.get(k)),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+# Shared instance for the whole process (all Streamlit sessions import this module once)
+STATEMENT_CACHE = StatementCache()
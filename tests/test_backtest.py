@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import HISTORY_FIELDS, attach_market_cap, derive_assumptions, run_backtest
+
+FIELDS = [f for fields in HISTORY_FIELDS.values() for f in fields]
+
+
+def _history(ticker: str, dates, revenue) -> pd.DataFrame:
+    h = pd.DataFrame({"ticker": ticker, "date": pd.DatetimeIndex(dates)})
+    for field in FIELDS:
+        h[field] = 10.0
+    h["revenue"] = revenue
+    h["shares"] = 1_000.0
+    return h
+
+
+def test_ttm_requires_complete_contiguous_windows():
+    # Quarter 2016-09-30 is missing (gap) and 2015-09-30 revenue is missing (null)
+    dates = pd.date_range("2015-03-31", periods=12, freq="QE").delete(6)
+    revenue = np.arange(1.0, 12.0) * 100
+    revenue[2] = np.nan
+    out = derive_assumptions(_history("A", dates, revenue), "quarterly").set_index("date")
+
+    # Windows containing the null or straddling the gap have no TTM
+    assert out.loc[:"2016-06-30", "revenue0"].isna().all()
+    assert out.loc["2016-12-31":"2017-06-30", "revenue0"].isna().all()
+    # First full window after the gap: rows 2016-12-31 .. 2017-09-30
+    assert out.loc["2017-09-30", "revenue0"] == pytest.approx(revenue[6:10].sum())
+    assert out.loc["2017-12-31", "revenue0"] == pytest.approx(revenue[7:11].sum())
+    # Growth needs a prior TTM in the same contiguous run
+    assert out["revenue_growth"].isna().all()
+
+
+def test_growth_uses_prior_ttm():
+    dates = pd.date_range("2015-03-31", periods=9, freq="QE")
+    revenue = np.full(9, 100.0)
+    revenue[4:] = 110.0
+    out = derive_assumptions(_history("A", dates, revenue), "quarterly")
+
+    assert out["revenue_growth"].iloc[:7].isna().all()
+    assert out["revenue_growth"].iloc[7] == pytest.approx(440.0 / 400.0 - 1)
+    assert out["revenue_growth"].iloc[8] == pytest.approx(440.0 / 410.0 - 1)
+
+
+def test_market_cap_unadjusts_split_prices():
+    dates = pd.to_datetime(["2023-12-31", "2024-12-31"])
+    history = _history("NVDA", dates, [100.0, 100.0])
+    # Split-adjusted closes (as Yahoo returns them) around a 10:1 split on 2024-06-10
+    prices = pd.DataFrame({"NVDA": [49.5, 134.3]}, index=pd.to_datetime(["2023-12-29", "2024-12-31"]))
+    splits = pd.DataFrame({"NVDA": [10.0]}, index=pd.to_datetime(["2024-06-10"]))
+    history["shares"] = [2.47e9, 24.5e9]
+
+    out = attach_market_cap(history, prices=prices, splits=splits)
+
+    assert out["market_cap"].tolist() == pytest.approx([49.5 * 10 * 2.47e9, 134.3 * 24.5e9])
+
+
+def test_per_row_inputs_follow_unsorted_history():
+    dates = pd.date_range("2015-03-31", periods=10, freq="QE")
+    history = pd.concat([
+        _history("A", dates, np.linspace(100, 200, 10)),
+        _history("B", dates, np.linspace(300, 250, 10)),
+    ], ignore_index=True)
+    history["market_cap"] = 1e4
+    wacc = pd.Series(np.where(history["ticker"] == "A", 0.08, 0.12), index=history.index)
+
+    shuffled = history.sample(frac=1.0, random_state=0)
+    expected = run_backtest(history=history, period="quarterly", wacc=wacc)
+    from_series = run_backtest(history=shuffled, period="quarterly", wacc=wacc.loc[shuffled.index])
+    from_array = run_backtest(history=shuffled, period="quarterly", wacc=wacc.loc[shuffled.index].to_numpy())
+
+    pd.testing.assert_frame_equal(from_series, expected)
+    pd.testing.assert_frame_equal(from_array, expected)
+    # Sanity: the per-ticker wacc actually changes the valuation
+    scalar = run_backtest(history=history, period="quarterly", wacc=0.08)
+    assert not np.allclose(scalar["Implied_EV"], expected["Implied_EV"])
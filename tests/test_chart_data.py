@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_data import downsample_grid, downsample_line, histogram_frame, lttb_indices, quantile_bands
+
+
+@pytest.mark.parametrize("n, max_points", [(10, 20), (5_000, 3), (5_000, 100), (100_000, 2_000)])
+def test_lttb_stays_within_budget(n, max_points):
+    rng = np.random.default_rng(0)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+
+    idx = lttb_indices(x, y, max_points=max_points)
+
+    assert len(idx) <= max_points
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+    df = pd.DataFrame({"Year": x, "FCFF": y})
+    assert len(downsample_line(df, "Year", "FCFF", max_points=max_points)) <= max_points
+
+
+@pytest.mark.parametrize(
+    "shape, max_points",
+    [((200, 300), 2_000), ((7, 5_000), 100), ((1_000, 1_000), 2_000), ((3, 3), 4), ((50, 50), 1), ((41, 43), 97)],
+)
+def test_grid_pooling_stays_within_budget(shape, max_points):
+    grid = pd.DataFrame(np.random.default_rng(1).random(shape))
+
+    pooled = downsample_grid(grid, max_points=max_points)
+
+    assert pooled.size <= max_points
+    # Pooled cells are block means, so the overall range can only shrink
+    assert pooled.to_numpy().min() >= grid.to_numpy().min()
+    assert pooled.to_numpy().max() <= grid.to_numpy().max()
+
+
+@pytest.mark.parametrize("bins, max_points", [(50, 2_000), (500, 120), (10, 1)])
+def test_histogram_stays_within_budget(bins, max_points):
+    values = np.random.default_rng(2).normal(size=10_000)
+
+    hist = histogram_frame(values, bins=bins, max_points=max_points)
+
+    assert len(hist) <= max_points
+    assert hist["Count"].sum() == len(values)
+
+
+def test_quantile_bands_stay_within_budget():
+    draws = np.random.default_rng(3).normal(size=(200, 5_000)).cumsum(axis=1)
+
+    bands = quantile_bands(np.arange(5_000), draws, max_points=300)
+
+    assert len(bands) <= 300
+    assert (bands["q05"] <= bands["q50"]).all() and (bands["q50"] <= bands["q95"]).all()
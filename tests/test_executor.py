@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+import executor
+from executor import SessionJobs
+
+
+def _wait(jobs: SessionJobs, slot: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = jobs.status(slot)
+        if status["state"] != "running":
+            return status
+        time.sleep(0.01)
+    raise TimeoutError(f"job in slot {slot!r} did not finish")
+
+
+def _recorder():
+    calls = []
+
+    def fn(x):
+        calls.append(x)
+        return x * 10
+
+    return fn, calls
+
+
+def test_superseded_job_never_runs():
+    fn, calls = _recorder()
+    jobs = SessionJobs()
+
+    first = jobs.submit("sim", fn, 1, key=1, debounce=0.2)
+    second = jobs.submit("sim", fn, 2, key=2, debounce=0.05)
+
+    status = _wait(jobs, "sim")
+    assert status["state"] == "done"
+    assert (status["key"], status["result"]) == (2, 20)
+    assert calls == [2]
+    assert first.future.cancelled() and second.future.result() == 20
+
+
+def test_same_key_reuses_pending_job():
+    fn, calls = _recorder()
+    jobs = SessionJobs()
+
+    job = jobs.submit("sim", fn, 3, key=3, debounce=0.05)
+    assert jobs.submit("sim", fn, 3, key=3, debounce=0.05) is job
+
+    assert _wait(jobs, "sim")["result"] == 30
+    assert calls == [3]
+
+
+def test_return_to_last_good_result_drops_pending_job():
+    fn, calls = _recorder()
+    jobs = SessionJobs()
+
+    jobs.submit("sim", fn, 1, key=1, debounce=0)
+    assert _wait(jobs, "sim")["result"] == 10
+
+    pending = jobs.submit("sim", fn, 2, key=2, debounce=0.2)
+    assert jobs.status("sim")["state"] == "running"
+    assert jobs.submit("sim", fn, 1, key=1, debounce=0.2) is None
+
+    status = jobs.status("sim")
+    assert status["state"] == "done"
+    assert (status["key"], status["result"], status["pending_key"]) == (1, 10, None)
+    time.sleep(0.3)
+    assert pending.future.cancelled()
+    assert calls == [1]
+
+
+def test_errors_propagate_until_next_submit():
+    jobs = SessionJobs()
+
+    def boom():
+        raise ValueError("bad inputs")
+
+    jobs.submit("sim", lambda: 5, key="ok", debounce=0)
+    _wait(jobs, "sim")
+    jobs.submit("sim", boom, key="bad", debounce=0)
+
+    status = _wait(jobs, "sim")
+    assert isinstance(status["error"], ValueError)
+    # Last good result is kept alongside the error
+    assert (status["key"], status["result"]) == ("ok", 5)
+    assert isinstance(jobs.status("sim")["error"], ValueError)
+
+    jobs.submit("sim", lambda: 6, key="fixed", debounce=0)
+    status = _wait(jobs, "sim")
+    assert status["error"] is None and status["result"] == 6
+
+
+# Debounce windows must not hold pool workers
+def test_debouncing_sessions_do_not_block_the_pool():
+    sessions = [SessionJobs() for _ in range(5 * executor.EXECUTOR_THREADS)]
+    for jobs in sessions:
+        jobs.submit("sim", lambda: None, key="slow", debounce=2.0)
+
+    started = threading.Event()
+    urgent = SessionJobs()
+    t0 = time.monotonic()
+    urgent.submit("sim", started.set, key="now", debounce=0)
+
+    assert started.wait(1.0)
+    assert time.monotonic() - t0 < 0.5
+    for jobs in sessions:
+        jobs.cancel("sim")
+
+
+def test_running_job_result_is_dropped_when_superseded():
+    release = threading.Event()
+    jobs = SessionJobs()
+
+    def slow():
+        release.wait(5)
+        return "stale"
+
+    first = jobs.submit("sim", slow, key="a", debounce=0)
+    time.sleep(0.05)
+    jobs.submit("sim", lambda: "fresh", key="b", debounce=0)
+    release.set()
+
+    status = _wait(jobs, "sim")
+    assert (status["key"], status["result"]) == ("b", "fresh")
+    with pytest.raises(executor.Superseded):
+        first.future.result(timeout=5)
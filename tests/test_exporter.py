@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from exporter import EXPORT_FORMATS, export_chunks, export_download, frame_chunks
+
+
+def _forecast(rows: int = 250) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Year": np.arange(1, rows + 1),
+        "Revenue": np.linspace(100.0, 500.0, rows),
+        "FCFF": np.linspace(-5.0, 40.0, rows),
+    })
+
+
+# The callable handed to st.download_button must produce data Streamlit can serialize
+@pytest.mark.parametrize("fmt", EXPORT_FORMATS)
+def test_export_download_is_accepted_by_streamlit(fmt):
+    df = _forecast()
+    build = export_download(lambda: frame_chunks(df, chunk_rows=100), fmt=fmt)
+
+    data, _ = convert_data_to_bytes_and_infer_mime(build(), unsupported_error=TypeError(fmt))
+
+    assert len(data) > 0
+    if fmt == "csv":
+        assert pd.read_csv(io.BytesIO(data)).shape == df.shape
+    elif fmt == "parquet":
+        pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(data)), df.astype(float))
+    else:
+        assert pd.read_excel(io.BytesIO(data)).shape == df.shape
+
+
+def test_parquet_null_first_chunk_and_int_to_float():
+    chunks = [
+        pd.DataFrame({"Year": [1, 2], "Note": [None, None]}),
+        pd.DataFrame({"Year": [3.5, np.nan], "Note": ["a", None]}),
+    ]
+    buf = io.BytesIO()
+
+    assert export_chunks(iter(chunks), buf, fmt="parquet") == 4
+
+    buf.seek(0)
+    table = pq.read_table(buf)
+    assert str(table.schema.field("Year").type) == "double"
+    assert pa.types.is_string(table.schema.field("Note").type) or pa.types.is_large_string(table.schema.field("Note").type)
+    assert table.column("Note").to_pylist() == [None, None, "a", None]
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from model import (
+    SENSITIVITY_INPUTS,
+    dcf_sensitivities,
+    dcf_sensitivities_batch,
+    dcf_valuation,
+    dcf_valuation_batch,
+    dcf_valuation_with_sensitivities,
+    decay_path,
+    fade_path,
+    forecast_fcff,
+    forecast_fcff_batch,
+    term_structure_rates,
+)
+
+BASE = {
+    "revenue0": 5_000.0,
+    "revenue_growth": 0.06,
+    "ebitda_margin": 0.22,
+    "da_pct_revenue": 0.03,
+    "capex_pct_revenue": 0.04,
+    "nwc_pct_revenue": 0.10,
+    "tax_rate": 0.25,
+    "wacc": 0.09,
+    "exit_multiple": 8.0,
+}
+YEARS = 5
+
+
+def _enterprise_value(a: dict) -> np.ndarray:
+    forecast = forecast_fcff_batch(
+        revenue0=a["revenue0"],
+        years=YEARS,
+        revenue_growth=a["revenue_growth"],
+        ebitda_margin=a["ebitda_margin"],
+        da_pct_revenue=a["da_pct_revenue"],
+        capex_pct_revenue=a["capex_pct_revenue"],
+        nwc_pct_revenue=a["nwc_pct_revenue"],
+        tax_rate=a["tax_rate"],
+    )
+    return dcf_valuation_batch(forecast, wacc=a["wacc"], exit_multiple=a["exit_multiple"])["Enterprise_Value"]
+
+
+# Central differences; a curve input is shifted in parallel (every year by the same h)
+def _finite_difference(a: dict, name: str) -> np.ndarray:
+    h = 1e-6 * max(float(np.max(np.abs(a[name]))), 1.0)
+    up = {**a, name: np.asarray(a[name], dtype=float) + h}
+    down = {**a, name: np.asarray(a[name], dtype=float) - h}
+    n_scen = len(dcf_sensitivities_batch(years=YEARS, **a)["Enterprise_Value"])
+    return np.broadcast_to((_enterprise_value(up) - _enterprise_value(down)) / (2 * h), (n_scen,))
+
+
+def _assert_matches_finite_differences(a: dict):
+    grads = dcf_sensitivities_batch(years=YEARS, **a)["Sensitivities"]
+    for name in SENSITIVITY_INPUTS:
+        np.testing.assert_allclose(grads[name], _finite_difference(a, name), rtol=1e-6, err_msg=name)
+
+
+def test_sensitivities_match_finite_differences_scalar():
+    _assert_matches_finite_differences(BASE)
+
+
+def test_sensitivities_match_finite_differences_per_scenario():
+    a = {**BASE, "revenue_growth": np.array([0.02, 0.06, 0.10]), "tax_rate": np.array([0.15, 0.25, 0.35])}
+    _assert_matches_finite_differences(a)
+
+
+# Only the valuation inputs vary by scenario: the forecast must still broadcast to every scenario
+@pytest.mark.parametrize("name", ["wacc", "exit_multiple"])
+def test_sensitivities_scenarios_from_valuation_inputs(name):
+    a = {**BASE, name: BASE[name] * np.array([0.8, 1.0, 1.2, 1.4])}
+    out = dcf_sensitivities_batch(years=YEARS, **a)
+    assert out["Enterprise_Value"].shape == (4,)
+    assert all(g.shape == (4,) for g in out["Sensitivities"].values())
+    _assert_matches_finite_differences(a)
+
+
+# Per-year curves: fade paths for the operating rates and a term-structure discount curve
+def test_sensitivities_match_finite_differences_curves():
+    a = {
+        **BASE,
+        "revenue_growth": fade_path(0.12, 0.03, YEARS),
+        "ebitda_margin": decay_path(0.18, 0.25, YEARS),
+        "capex_pct_revenue": fade_path([0.06, 0.08], [0.04, 0.03], YEARS),
+        "nwc_pct_revenue": fade_path(0.08, 0.12, YEARS),
+        "tax_rate": fade_path(0.21, 0.27, YEARS),
+        "wacc": term_structure_rates([1, 2, 5, 10], [0.040, 0.042, 0.045, 0.048], YEARS, spread=0.045),
+    }
+    _assert_matches_finite_differences(a)
+
+
+def test_sensitivities_single_scenario_curves():
+    growth = [0.10, 0.08, 0.06, 0.05, 0.04]
+    a = {**BASE, "revenue_growth": growth}
+    sens = dcf_sensitivities(years=YEARS, **a)
+    batch = dcf_sensitivities_batch(years=YEARS, **{**a, "revenue_growth": np.asarray(growth)[None, :]})
+    assert sens["revenue_growth"] == pytest.approx(float(batch["Sensitivities"]["revenue_growth"][0]))
+
+    forecast = forecast_fcff(years=YEARS, **{k: v for k, v in a.items() if k not in ("wacc", "exit_multiple")})
+    ev = dcf_valuation(forecast, BASE["wacc"], BASE["exit_multiple"])["Enterprise_Value"]
+    assert float(batch["Enterprise_Value"][0]) == pytest.approx(ev)
+
+
+def test_paths_are_scenario_by_year():
+    assert fade_path(0.1, 0.03, YEARS).shape == (1, YEARS)
+    assert decay_path(0.1, 0.03, YEARS).shape == (1, YEARS)
+    assert fade_path([0.1, 0.2], 0.03, YEARS).shape == (2, YEARS)
+    assert decay_path([0.1, 0.2, 0.3], 0.03, YEARS).shape == (3, YEARS)
+    assert term_structure_rates([1, 10], [0.04, 0.05], YEARS).shape == (1, YEARS)
+
+
+# One pass gives the same valuation as forecast_fcff + dcf_valuation
+def test_valuation_with_sensitivities_matches_dcf_valuation():
+    val, sens = dcf_valuation_with_sensitivities(years=YEARS, **BASE)
+    forecast = forecast_fcff(years=YEARS, **{k: v for k, v in BASE.items() if k not in ("wacc", "exit_multiple")})
+    expected = dcf_valuation(forecast, BASE["wacc"], BASE["exit_multiple"])
+
+    assert val == pytest.approx(expected, rel=1e-12)
+    assert sens.equals(dcf_sensitivities(years=YEARS, **BASE))
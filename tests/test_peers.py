@@ -0,0 +1,71 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import peers
+from peers import PeerMultiplesIndex, fetch_peer_multiples, get_peer_index
+
+
+def _stub_row(ticker: str):
+    if ticker == "BAD":
+        return None
+    n = sum(ord(ch) for ch in ticker)
+    return {
+        "ticker": ticker,
+        "sector": "Technology" if n % 2 else "Energy",
+        "industry": "Software",
+        "ev_ebitda": 5.0 + n % 17,
+        "ev_revenue": 1.0 + n % 5,
+    }
+
+
+@pytest.fixture
+def stub_fetch(monkeypatch):
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fetch(ticker):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.01)
+        with lock:
+            active["now"] -= 1
+        return _stub_row(ticker)
+
+    monkeypatch.setattr(peers, "_fetch_peer_row", fetch)
+    monkeypatch.setattr(peers, "_PEER_INDEX_CACHE", peers.OrderedDict())
+    return active
+
+
+def test_fetch_runs_concurrently_and_keeps_order(stub_fetch):
+    tickers = [f"T{i:03d}" for i in range(64)] + ["BAD"]
+
+    frame = fetch_peer_multiples(tickers, max_workers=16)
+
+    assert list(frame["ticker"]) == tickers[:-1]
+    assert stub_fetch["peak"] > 1
+
+
+def test_index_cache_is_bounded_lru(stub_fetch, monkeypatch):
+    monkeypatch.setattr(peers, "PEER_CACHE_MAX_ENTRIES", 3)
+
+    first = get_peer_index(["A1", "A2"])
+    for i in range(5):
+        get_peer_index([f"B{i}", "A1"])
+        assert get_peer_index(["a2", " A1 "]) is first  # Normalized key, refreshed as most recent
+
+    assert len(peers._PEER_INDEX_CACHE) == 3
+    assert ("A1", "A2") in peers._PEER_INDEX_CACHE
+
+
+def test_percentiles_match_numpy(stub_fetch):
+    index = PeerMultiplesIndex(fetch_peer_multiples([f"T{i:03d}" for i in range(40)]))
+    values = index.multiples["ev_ebitda"].to_numpy(dtype=float)
+
+    for q in (0, 10, 25, 50, 75, 90, 100):
+        assert index.percentile("ev_ebitda", q) == pytest.approx(np.percentile(values, q))
+    tech = index.multiples.loc[index.multiples["sector"] == "Technology", "ev_ebitda"].to_numpy(dtype=float)
+    assert index.median("ev_ebitda", "sector", "Technology") == pytest.approx(np.median(tech))
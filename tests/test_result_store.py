@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import forecast_fcff
+from result_store import (
+    ResultStore,
+    dumps_payload,
+    loads_payload,
+    result_key,
+    stored_dcf_valuation,
+    stored_forecast_fcff_keyed,
+)
+
+FORECAST_INPUTS = {
+    "revenue0": 100.0,
+    "years": 5,
+    "revenue_growth": 0.05,
+    "ebitda_margin": 0.20,
+    "da_pct_revenue": 0.03,
+    "capex_pct_revenue": 0.04,
+    "nwc_pct_revenue": 0.10,
+    "tax_rate": 0.25,
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / "results.sqlite"))
+
+
+def test_result_key_is_stable_and_typed():
+    a = result_key("f", {"wacc": 0.09, "years": 5, "name": "x"})
+    b = result_key("f", {"name": "x", "years": 5, "wacc": np.float64(0.09)})
+    assert a == b
+    assert result_key("f", {"wacc": 0.1}) != result_key("f", {"wacc": "0.1"})
+    assert result_key("f", {"years": 5}) != result_key("f", {"years": 5.0})
+    assert result_key("f", {"wacc": 0.09}) != result_key("g", {"wacc": 0.09})
+    assert result_key("f", {"wacc": 0.09}, model_version="0") != result_key("f", {"wacc": 0.09})
+
+
+def test_payload_round_trip_is_exact():
+    frame = pd.DataFrame(
+        {"Year": np.arange(1, 4), "FCFF": [0.1 + 0.2, np.nan, 1e-300], "Label": ["a", "b", None]},
+        index=pd.Index([10, 20, 30], name="row"),
+    )
+    value = {"frame": frame, "PV_FCFF": np.float64(1 / 3), "count": np.int64(7), "nested": [1.5, {"x": 2.0}]}
+
+    out = loads_payload(dumps_payload(value))
+
+    pd.testing.assert_frame_equal(out["frame"], frame)
+    assert out["PV_FCFF"] == 1 / 3
+    assert out["count"] == 7
+    assert out["nested"] == [1.5, {"x": 2.0}]
+
+    forecast = forecast_fcff(**FORECAST_INPUTS)
+    pd.testing.assert_frame_equal(loads_payload(dumps_payload(forecast)), forecast)
+
+
+def test_directory_created_on_first_use(tmp_path):
+    path = tmp_path / "nested" / "results.sqlite"
+    store = ResultStore(str(path))
+    assert not path.parent.exists()
+
+    store.put("k", {"v": 1.0})
+    assert store.get("k") == {"v": 1.0}
+    assert path.exists()
+
+
+def test_cached_call_and_keyed_valuation(store):
+    calls = []
+
+    def fn(x):
+        calls.append(x)
+        return {"y": x * 2}
+
+    assert store.cached_call(fn, x=1.5) == {"y": 3.0}
+    assert store.cached_call(fn, x=1.5) == {"y": 3.0}
+    assert calls == [1.5]
+
+    forecast, key = stored_forecast_fcff_keyed(store=store, **FORECAST_INPUTS)
+    hashed = stored_dcf_valuation(forecast, 0.09, 8.0, store=store)
+    keyed = stored_dcf_valuation(forecast, 0.09, 8.0, store=store, forecast_key=key)
+    assert keyed == hashed
+
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["entries_by_fn"] == {"fn": 1, "forecast_fcff": 1, "dcf_valuation": 2}
+
+
+def test_prune_drops_least_recently_used(store):
+    payload = {"values": list(np.linspace(0.0, 1.0, 200))}
+    for i in range(10):
+        store.put(f"k{i}", payload)
+        time.sleep(0.002)
+    # Buffered access on the oldest entry must count before pruning
+    assert store.get("k0") is not None
+
+    nbytes = store.stats()["bytes"] // 10
+    removed = store.prune(max_bytes=nbytes * 5)
+
+    assert removed == 6
+    kept = [f"k{i}" for i in range(10) if store.get(f"k{i}") is not None]
+    assert kept == ["k0", "k7", "k8", "k9"]
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import dcf_valuation_batch, enterprise_value_batch, forecast_fcff_batch
+from sensitivity_cube import build_cube, open_cube
+
+BASE = {
+    "revenue0": 5_000.0,
+    "years": 5,
+    "revenue_growth": 0.06,
+    "ebitda_margin": 0.22,
+    "da_pct_revenue": 0.03,
+    "capex_pct_revenue": 0.04,
+    "nwc_pct_revenue": 0.10,
+    "tax_rate": 0.25,
+    "wacc": 0.09,
+    "exit_multiple": 8.0,
+}
+AXES = {
+    "wacc": np.linspace(0.06, 0.14, 4),
+    "exit_multiple": np.linspace(5.0, 14.0, 5),
+    "ebitda_margin": np.linspace(-0.05, 0.30, 3),
+    "revenue_growth": np.linspace(0.0, 0.15, 6),
+}
+
+
+# Independent in-RAM reference through the full forecast + valuation path
+def _reference() -> np.ndarray:
+    grids = np.meshgrid(*AXES.values(), indexing="ij")
+    inputs = {**BASE, **{name: g.ravel() for name, g in zip(AXES, grids)}}
+    forecast = forecast_fcff_batch(
+        revenue0=inputs["revenue0"],
+        years=BASE["years"],
+        revenue_growth=inputs["revenue_growth"],
+        ebitda_margin=inputs["ebitda_margin"],
+        da_pct_revenue=inputs["da_pct_revenue"],
+        capex_pct_revenue=inputs["capex_pct_revenue"],
+        nwc_pct_revenue=inputs["nwc_pct_revenue"],
+        tax_rate=inputs["tax_rate"],
+    )
+    ev = dcf_valuation_batch(forecast, wacc=inputs["wacc"], exit_multiple=inputs["exit_multiple"])["Enterprise_Value"]
+    return ev.reshape(grids[0].shape)
+
+
+@pytest.fixture(scope="module")
+def cube(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cube") / "cube.npy"
+    # Small blocks so every code path crosses block boundaries
+    build_cube(str(path), AXES, BASE, dtype="float64", block_cells=37)
+    return open_cube(str(path))
+
+
+@pytest.fixture(scope="module")
+def ref():
+    return _reference()
+
+
+def test_enterprise_value_batch_matches_full_model(ref):
+    grids = np.meshgrid(*AXES.values(), indexing="ij")
+    inputs = {**BASE, **{name: g.ravel() for name, g in zip(AXES, grids)}}
+    ev = enterprise_value_batch(**inputs)
+    np.testing.assert_allclose(ev.reshape(ref.shape), ref, rtol=1e-12)
+
+
+def test_cube_values_and_sel(cube, ref):
+    assert cube.shape == ref.shape
+    np.testing.assert_allclose(np.asarray(cube.data), ref, rtol=1e-12)
+
+    grid = cube.sel(ebitda_margin=0.30, revenue_growth=0.06)
+    assert list(grid.index) == pytest.approx(AXES["wacc"])
+    assert list(grid.columns) == pytest.approx(AXES["exit_multiple"])
+    np.testing.assert_allclose(grid.to_numpy(), ref[:, :, 2, 2], rtol=1e-12)
+
+    line = cube.sel(wacc=0.09, exit_multiple=8.0, ebitda_margin=0.125)
+    np.testing.assert_allclose(line.to_numpy(), ref[1, 1, 1, :], rtol=1e-12)
+
+    point = cube.sel(wacc=0.14, exit_multiple=14.0, ebitda_margin=-0.05, revenue_growth=0.0)
+    assert float(point) == pytest.approx(ref[3, 4, 0, 0])
+
+
+@pytest.mark.parametrize("stat", ["mean", "min", "max", "sum"])
+@pytest.mark.parametrize("keep", [("wacc",), ("revenue_growth",), ("exit_multiple", "revenue_growth"), ("wacc", "ebitda_margin"), ()])
+def test_marginal_matches_numpy(cube, ref, stat, keep):
+    names = list(AXES)
+    reduce_axes = tuple(i for i, n in enumerate(names) if n not in keep)
+    expected = getattr(np, stat)(ref, axis=reduce_axes) if reduce_axes else ref
+
+    out = cube.marginal(keep, stat=stat, block_cells=50)
+
+    np.testing.assert_allclose(np.asarray(out, dtype=float), expected, rtol=1e-10)
+    if len(keep) == 1:
+        assert isinstance(out, pd.Series) and out.index.name == keep[0]
+    if len(keep) == 2:
+        assert isinstance(out, pd.DataFrame) and (out.index.name, out.columns.name) == keep
+
+
+def test_percentiles_match_numpy(cube, ref):
+    q = (5, 25, 50, 75, 95)
+
+    by_axis = cube.percentiles(q, by="exit_multiple")
+    expected = np.stack([np.percentile(ref[:, i], q) for i in range(ref.shape[1])])
+    np.testing.assert_allclose(by_axis.to_numpy(), expected, rtol=1e-10)
+
+    # Global percentiles are exact; small bin counts force several values per bin
+    for bins in (1 << 16, 7):
+        overall = cube.percentiles(q, bins=bins, block_cells=50)
+        np.testing.assert_allclose(overall.to_numpy(), np.percentile(ref, q), rtol=1e-10)